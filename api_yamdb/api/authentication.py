@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+KEY_PREFIX = 'jwt-user'
+# Fields of the cached token user: what permissions check. Other fields
+# are deferred and load from the database when a view reads them.
+CACHED_FIELDS = ('id', 'role', 'is_superuser', 'is_active')
+
+
+def get_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def get_user_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Drop cached user now and once more after commit.
+
+    The second delete drops the user cached by requests that read it
+    before the writing transaction was committed.
+    """
+    key = get_user_key(user_id)
+    get_cache().delete(key)
+    transaction.on_commit(lambda: get_cache().delete(key))
+
+
+def get_cached_user(values):
+    """User with CACHED_FIELDS loaded, as .only() would return it."""
+    model = get_user_model()
+    return model.from_db(
+        router.db_for_read(model), CACHED_FIELDS,
+        [values[field] for field in CACHED_FIELDS],
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that reads the token user from cache.
+
+    The cache holds CACHED_FIELDS of the user, not the password or the
+    confirmation code, and saves the users table lookup on every
+    authenticated request. Saving or deleting a user drops it (see
+    api.signals) in a shared cache backend; LocMemCache is per process,
+    so other workers see the change when USER_CACHE_TIMEOUT expires.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        cache = get_cache()
+        key = get_user_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key, {field: getattr(user, field) for field in CACHED_FIELDS},
+                settings.USER_CACHE_TIMEOUT,
+            )
+            return user
+        if not values['is_active']:
+            return super().get_user(validated_token)
+        return get_cached_user(values)
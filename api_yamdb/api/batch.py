@@ -0,0 +1,152 @@
+from api.serializers import TitleBatchItemSerializer
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from reviews.models import Category, Genre, Title
+from reviews.signals import catalog_reloaded
+
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def validate_items(items):
+    """Validate fields of every item, return data or errors per item."""
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append((None, {'non_field_errors': ['Expected a dict']}))
+            continue
+        serializer = TitleBatchItemSerializer(
+            data=item, partial='id' in item
+        )
+        if serializer.is_valid():
+            results.append((serializer.validated_data, None))
+        else:
+            results.append((None, serializer.errors))
+    return results
+
+
+def resolve_references(results):
+    """Check slugs, ids and names of the whole batch with set lookups."""
+    valid = [data for data, errors in results if errors is None]
+    categories = {
+        category.slug: category for category in Category.objects.filter(
+            slug__in={data['category'] for data in valid
+                      if data.get('category')}
+        )
+    }
+    genres = dict(Genre.objects.filter(
+        slug__in={slug for data in valid for slug in data.get('genre', ())}
+    ).values_list('slug', 'id'))
+    titles = Title.objects.select_for_update().in_bulk(
+        {data['id'] for data in valid if 'id' in data}
+    )
+    taken_names = dict(Title.objects.filter(
+        name__in={data['name'] for data in valid if 'name' in data}
+    ).values_list('name', 'id'))
+    batch_names = set()
+    checked = []
+    for data, errors in results:
+        if errors is None:
+            errors = {}
+            if 'id' in data and data['id'] not in titles:
+                errors['id'] = ['Title does not exist']
+            if data.get('category') and data['category'] not in categories:
+                errors['category'] = [
+                    f'Category {data["category"]} does not exist'
+                ]
+            missing = [
+                slug for slug in data.get('genre', ()) if slug not in genres
+            ]
+            if missing:
+                errors['genre'] = [
+                    f'Genre {slug} does not exist' for slug in missing
+                ]
+            name = data.get('name')
+            if name is not None and (
+                name in batch_names
+                or taken_names.get(name, data.get('id')) != data.get('id')
+            ):
+                errors['name'] = ['Title with this name already exists']
+            batch_names.add(name)
+            errors = errors or None
+        checked.append((data, errors))
+    return checked, categories, genres, titles
+
+
+def build_titles(checked, categories, titles):
+    """Apply valid items to new and loaded titles."""
+    now = timezone.now()
+    created, updated, linked = [], [], []
+    for data, errors in checked:
+        if errors is not None:
+            continue
+        title = titles[data['id']] if 'id' in data else Title()
+        for field in TITLE_FIELDS:
+            if field == 'category' and field in data:
+                title.category = categories.get(data['category'])
+            elif field in data:
+                setattr(title, field, data[field])
+        title.version += 1
+        title.modified = now
+        (updated if title.pk else created).append(title)
+        if 'genre' in data:
+            linked.append((title, data['genre']))
+    return created, updated, linked
+
+
+def save_titles(created, updated):
+    Title.objects.bulk_create(created)
+    if any(title.pk is None for title in created):
+        # Backends that do not return ids from bulk inserts, as SQLite.
+        ids = dict(Title.objects.filter(
+            name__in=[title.name for title in created]
+        ).values_list('name', 'id'))
+        for title in created:
+            title.pk = ids[title.name]
+    Title.objects.bulk_update(updated, TITLE_FIELDS + ('version', 'modified'))
+
+
+def write_titles(items):
+    """Create and update titles of a batch in one transaction.
+
+    Items with an id update that title, the rest are created. Every
+    item gets its own result, and items with errors are not written.
+    """
+    with transaction.atomic():
+        checked, categories, genres, titles = resolve_references(
+            validate_items(items)
+        )
+        created, updated, linked = build_titles(checked, categories, titles)
+        try:
+            save_titles(created, updated)
+        except IntegrityError:
+            raise ValidationError(
+                'Titles were changed by another request, send the batch again'
+            )
+        link_genres(linked, genres)
+    if created or updated:
+        catalog_reloaded.send(sender=Title)
+    created_ids = iter(title.pk for title in created)
+    results = []
+    for data, errors in checked:
+        if errors is not None:
+            results.append({'status': 'error', 'errors': errors})
+        elif 'id' in data:
+            results.append({'status': 'updated', 'id': data['id']})
+        else:
+            results.append({'status': 'created', 'id': next(created_ids)})
+    return results
+
+
+def link_genres(linked, genres):
+    """Replace genres of titles with two queries."""
+    if not linked:
+        return
+    through = Title.genre.through
+    through.objects.filter(
+        title_id__in=[title.pk for title, _ in linked]
+    ).delete()
+    through.objects.bulk_create([
+        through(title_id=title.pk, genre_id=genres[slug])
+        for title, slugs in linked for slug in dict.fromkeys(slugs)
+    ])
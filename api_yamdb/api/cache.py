@@ -0,0 +1,133 @@
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+KEY_PREFIX = 'response-cache'
+GROUPS = ('titles', 'categories', 'genres')
+STATS = ('hit', 'miss')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_generation(group):
+    """Return current token of the group, every write replaces it.
+
+    A random token instead of a counter keeps evicted generation keys
+    from bringing old entries back.
+    """
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:{group}:generation'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid4().hex, timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generations(groups):
+    get_cache().set_many(
+        {f'{KEY_PREFIX}:{group}:generation': uuid4().hex for group in groups},
+        timeout=None,
+    )
+
+
+def invalidate(*groups):
+    """Drop cached responses of groups now and once more after commit.
+
+    The second bump drops responses cached by readers that ran before
+    the writing transaction was committed.
+    """
+    bump_generations(groups)
+    transaction.on_commit(lambda: bump_generations(groups))
+
+
+def count(group, stat):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:{group}:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """Return hit and miss counters of every group."""
+    keys = [
+        f'{KEY_PREFIX}:{group}:{stat}' for group in GROUPS for stat in STATS
+    ]
+    values = get_cache().get_many(keys)
+    return {
+        group: {stat: values.get(f'{KEY_PREFIX}:{group}:{stat}', 0)
+                for stat in STATS}
+        for group in GROUPS
+    }
+
+
+def get_role(user):
+    """Part of auth state that can change a response."""
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+    return f'{user.role}{"+superuser" if user.is_superuser else ""}'
+
+
+def get_cache_key(request, group):
+    query = sorted(
+        (key, value) for key, values in request.query_params.lists()
+        for value in values
+    )
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.path}?{query}'.encode()
+    ).hexdigest()
+    return (
+        f'{KEY_PREFIX}:{group}:{get_generation(group)}:'
+        f'{get_role(request.user)}:{digest}'
+    )
+
+
+class CachedResponseMixin:
+    """Serve list from the response cache.
+
+    Entries are kept per path, query params and role, and are dropped
+    by writes to the models listed in api.signals.
+    """
+
+    cache_group = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = get_cache_key(request, self.cache_group)
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_group, 'hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        count(self.cache_group, 'miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Serve list and retrieve from the response cache.
+
+    A separate mixin, as routers add a detail GET route to any viewset
+    with a retrieve method.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
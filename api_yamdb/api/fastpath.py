@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from reviews.models import Title
+
+DATETIME = serializers.DateTimeField()
+
+
+class FastListMixin:
+    """Build list responses from .values() rows, skipping serializers.
+
+    Rows are dicts with the keys, order and values of the serializer
+    output, see tests/test_fast_list.py. Requests with ?expand= and
+    other actions go through the serializer.
+
+    row_lookups maps every serializer field to the values() lookups
+    that render it. By default a field is the value of its first lookup,
+    with datetimes formatted as DRF does.
+    """
+
+    row_lookups = {}
+
+    def use_fast_list(self):
+        return (
+            settings.FAST_LIST_RESPONSES
+            and 'expand' not in self.request.query_params
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+        keys = list(self.get_serializer().fields)
+        lookups = {'id'}
+        for key in keys:
+            lookups.update(self.row_lookups[key])
+        queryset = self.filter_queryset(self.get_queryset())
+        values = queryset.prefetch_related(None).values(*lookups)
+        page = self.paginate_queryset(values)
+        rows = self.get_rows(list(values if page is None else page), keys)
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+    def get_rows(self, values, keys):
+        return [self.to_row(row, keys) for row in values]
+
+    def to_row(self, row, keys):
+        result = {}
+        for key in keys:
+            value = row[self.row_lookups[key][0]]
+            if isinstance(value, datetime):
+                value = DATETIME.to_representation(value)
+            result[key] = value
+        return result
+
+
+class TitleFastListMixin(FastListMixin):
+    row_lookups = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'category': ('category__name', 'category__slug'),
+        'genre': (),
+        'rating': ('rating',),
+    }
+
+    def get_rows(self, values, keys):
+        if 'genre' in keys:
+            # Genres in their default ordering, as prefetch_related loads.
+            self.genres = defaultdict(list)
+            links = Title.genre.through.objects.filter(
+                title_id__in=[row['id'] for row in values]
+            ).order_by('-genre_id').values_list(
+                'title_id', 'genre__name', 'genre__slug'
+            )
+            for title_id, name, slug in links:
+                self.genres[title_id].append({'name': name, 'slug': slug})
+        return super().get_rows(values, keys)
+
+    def to_row(self, row, keys):
+        result = {}
+        for key in keys:
+            if key == 'category':
+                result[key] = None if row['category__slug'] is None else {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                }
+            elif key == 'genre':
+                result[key] = self.genres.get(row['id'], [])
+            else:
+                result[key] = row[key]
+        return result
+
+
+class ReviewFastListMixin(FastListMixin):
+    row_lookups = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'title': ('title_id',),
+    }
+
+
+class CommentFastListMixin(FastListMixin):
+    row_lookups = {
+        'id': ('id',),
+        'author': ('author__username',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+        'review': ('review_id',),
+    }
@@ -0,0 +1,69 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import ListSerializer
+
+
+def get_param_set(request, name):
+    """Return comma separated names of a query param, None if absent."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """Render only ?fields= and nest only ?expand= relations.
+
+    expandable_fields maps a field to the serializer class rendering the
+    related object nested, otherwise the declared compact field is used.
+    Relations in default_expand are nested when ?expand= is absent.
+    Writes are not affected.
+    """
+
+    expandable_fields = {}
+    default_expand = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        expand = get_param_set(request, 'expand')
+        if expand is None:
+            expand = set(self.default_expand)
+        for name, serializer_class in self.expandable_fields.items():
+            if name in expand and name in fields:
+                many = isinstance(
+                    fields[name], (ManyRelatedField, ListSerializer)
+                )
+                fields[name] = serializer_class(read_only=True, many=many)
+        requested = get_param_set(request, 'fields')
+        if requested:
+            for name in list(fields):
+                if name not in requested:
+                    del fields[name]
+        return fields
+
+
+class SparseFieldsetMixin:
+    """Let get_queryset skip joins of fields a response does not render."""
+
+    def get_requested_fields(self):
+        return get_param_set(self.request, 'fields')
+
+    def get_expanded_fields(self, serializer_class):
+        expand = get_param_set(self.request, 'expand')
+        if expand is None:
+            return set(serializer_class.default_expand)
+        return expand
+
+    def is_rendered(self, name):
+        requested = self.get_requested_fields()
+        return not requested or name in requested
+
+    def only_rendered(self, queryset, columns):
+        """Load only the rendered columns of a ?fields= response."""
+        requested = self.get_requested_fields()
+        if not requested:
+            return queryset
+        return queryset.only('id', *(requested & set(columns)))
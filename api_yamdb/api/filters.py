@@ -0,0 +1,58 @@
+from django.db.models import F
+from django_filters import rest_framework as filters
+from reviews.leaderboards import RATING_ORDER
+from reviews.models import Title
+
+# Columns of every ?ordering= of titles, ascending and descending. Each
+# one follows an index of Title, ties go by id. Rating orders by the
+# exact mean score. Unrated titles go last both ways, so only descending
+# rating reads title_mean_rating_idx in order.
+TITLE_ORDERINGS = {
+    'rating': (
+        (F('mean_rating').asc(nulls_last=True), 'score_count', 'id'),
+        RATING_ORDER,
+    ),
+    'reviews_count': (('score_count', 'id'), ('-score_count', '-id')),
+    'year': (('year', 'id'), ('-year', '-id')),
+    'name': (('name',), ('-name',)),
+}
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """?ordering= of titles by rating, reviews_count, year or name."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('fields', tuple(TITLE_ORDERINGS))
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ordering = []
+        for param in value:
+            ascending, descending = TITLE_ORDERINGS[param.lstrip('-')]
+            ordering.extend(
+                descending if param.startswith('-') else ascending
+            )
+        return qs.order_by(*ordering)
+
+
+class TitleFilter(filters.FilterSet):
+    """Filters of the title list by stored columns and slugs."""
+    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(field_name='genre__slug')
+    reviews_count__gte = filters.NumberFilter(
+        field_name='score_count', lookup_expr='gte'
+    )
+    reviews_count__lte = filters.NumberFilter(
+        field_name='score_count', lookup_expr='lte'
+    )
+    ordering = TitleOrderingFilter()
+
+    class Meta:
+        model = Title
+        fields = {
+            'name': ('exact',),
+            'year': ('exact', 'gte', 'lte'),
+            'rating': ('gte', 'lte'),
+        }
@@ -0,0 +1,230 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+mail_queue = None
+
+
+class MailQueue:
+    """Deliver mail from background threads in batches.
+
+    Each batch goes over one backend connection. Messages the backend
+    refused are retried with a growing delay, and ones that still fail
+    are appended to the dead letter file. With no workers messages are
+    delivered by the caller. At exit the queue is flushed for at most
+    shutdown_timeout seconds, messages still queued go to dead letters.
+    """
+
+    def __init__(self, workers=2, batch_size=50, batch_wait=0.5, retries=3,
+                 retry_delay=1.0, dead_letter_file=None, backend=None,
+                 shutdown_timeout=10.0):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.dead_letter_file = dead_letter_file
+        self.backend = backend
+        self.shutdown_timeout = shutdown_timeout
+        self.queue = queue.Queue()
+        self.threads = []
+        self.exit_registered = False
+        self.lock = threading.Lock()
+        self.counters = {
+            'enqueued': 0, 'sent': 0, 'retried': 0, 'dead': 0, 'batches': 0,
+        }
+        self.latency = {'count': 0, 'sum': 0.0, 'max': 0.0}
+
+    def start(self):
+        with self.lock:
+            if not self.exit_registered:
+                atexit.register(self.shutdown)
+                self.exit_registered = True
+            self.threads = [
+                thread for thread in self.threads if thread.is_alive()
+            ]
+            for number in range(len(self.threads), self.workers):
+                thread = threading.Thread(
+                    target=self.work, name=f'mail-worker-{number}',
+                    daemon=True,
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def put(self, message):
+        self.count('enqueued')
+        item = (time.monotonic(), message)
+        if not self.workers:
+            self.deliver([item])
+            return
+        self.start()
+        self.queue.put(item)
+
+    def get_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def work(self):
+        while True:
+            batch = self.get_batch()
+            try:
+                self.deliver(batch)
+            except Exception:
+                logger.exception('Mail batch was lost')
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def deliver(self, batch):
+        self.count('batches')
+        pending = batch
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.count('retried', len(pending))
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            pending, error = self.send(pending)
+            if not pending:
+                return
+        self.write_dead_letters(pending, error)
+
+    def send(self, batch):
+        """Send batch over one connection, return failed items."""
+        try:
+            connection = get_connection(self.backend)
+            connection.open()
+        except Exception as error:
+            logger.warning(f'Mail backend is unavailable: {error}')
+            return batch, error
+        failed, last_error = [], None
+        try:
+            for enqueued, message in batch:
+                message.connection = connection
+                try:
+                    message.send()
+                except Exception as error:
+                    failed.append((enqueued, message))
+                    last_error = error
+                else:
+                    self.record_latency(time.monotonic() - enqueued)
+                finally:
+                    message.connection = None
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return failed, last_error
+
+    def write_dead_letters(self, items, error):
+        self.count('dead', len(items))
+        logger.error(f'{len(items)} messages were not delivered: {error}')
+        if not self.dead_letter_file:
+            return
+        os.makedirs(os.path.dirname(self.dead_letter_file), exist_ok=True)
+        with self.lock, open(self.dead_letter_file, 'a') as file:
+            for _, message in items:
+                file.write(json.dumps({
+                    'subject': message.subject,
+                    'body': message.body,
+                    'from_email': message.from_email,
+                    'to': message.to,
+                    'error': str(error),
+                    'failed_at': timezone.now().isoformat(),
+                }, ensure_ascii=False) + '\n')
+
+    def count(self, counter, value=1):
+        with self.lock:
+            self.counters[counter] += value
+
+    def record_latency(self, seconds):
+        with self.lock:
+            self.counters['sent'] += 1
+            self.latency['count'] += 1
+            self.latency['sum'] += seconds
+            self.latency['max'] = max(self.latency['max'], seconds)
+
+    def flush(self, timeout=None):
+        """Wait until queued messages are handled, return False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Flush at exit, write messages left in the queue to dead letters."""
+        atexit.unregister(self.shutdown)
+        if self.flush(
+            self.shutdown_timeout if timeout is None else timeout
+        ):
+            return True
+        left = []
+        while True:
+            try:
+                left.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            self.queue.task_done()
+        if left:
+            self.write_dead_letters(left, 'Mail queue was not flushed at exit')
+        return False
+
+    def get_stats(self):
+        with self.lock:
+            latency = dict(self.latency)
+            stats = dict(self.counters)
+        stats['queue_depth'] = self.queue.qsize()
+        stats['workers'] = sum(thread.is_alive() for thread in self.threads)
+        count = latency['count']
+        stats['latency'] = {
+            'count': count,
+            'avg': latency['sum'] / count if count else 0,
+            'max': latency['max'],
+        }
+        return stats
+
+
+def get_mail_queue():
+    global mail_queue
+    if mail_queue is None:
+        mail_queue = MailQueue(
+            workers=settings.MAIL_QUEUE_WORKERS,
+            batch_size=settings.MAIL_QUEUE_BATCH_SIZE,
+            batch_wait=settings.MAIL_QUEUE_BATCH_WAIT,
+            retries=settings.MAIL_QUEUE_RETRIES,
+            retry_delay=settings.MAIL_QUEUE_RETRY_DELAY,
+            dead_letter_file=settings.MAIL_DEAD_LETTER_FILE,
+            shutdown_timeout=settings.MAIL_QUEUE_SHUTDOWN_TIMEOUT,
+        )
+    return mail_queue
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Queue a message for delivery and return at once."""
+    get_mail_queue().put(
+        EmailMessage(subject, message, from_email, recipient_list)
+    )
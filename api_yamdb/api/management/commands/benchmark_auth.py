@@ -0,0 +1,64 @@
+import time
+
+from api.mail import get_mail_queue
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Measure requests per second of signup and token endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='requests of every kind to send',
+        )
+
+    def measure(self, name, requests):
+        """Send requests, print rate and queries per request."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for send in requests:
+                response = send()
+                assert response.status_code == 200, response.content
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {len(requests) / elapsed:.0f} req/s, '
+            f'{len(queries) / len(requests):.1f} queries per request'
+        )
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'
+    )
+    def handle(self, **options):
+        client = APIClient()
+        users = [
+            {'username': f'bench-{number}',
+             'email': f'bench-{number}@example.com'}
+            for number in range(options['requests'])
+        ]
+
+        def signup(data):
+            return lambda: client.post('/api/v1/auth/signup/', data)
+
+        def token(data):
+            return lambda: client.post('/api/v1/auth/token/', data)
+
+        with transaction.atomic():
+            self.measure('signup new', [signup(data) for data in users])
+            self.measure('signup again', [signup(data) for data in users])
+            codes = dict(User.objects.filter(
+                username__startswith='bench-'
+            ).values_list('username', 'confirmation_code'))
+            self.measure('token', [
+                token({'username': data['username'],
+                       'confirmation_code': codes[data['username']]})
+                for data in users
+            ])
+            transaction.set_rollback(True)
+        get_mail_queue().flush(timeout=10)
@@ -0,0 +1,267 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Genre, Review, Title
+from users.models import User
+
+LOADTEST_USER_PREFIX = 'loadtest-'
+# Read operations and their share of reads.
+READS = (
+    ('titles list', 30),
+    ('titles by genre', 10),
+    ('title', 20),
+    ('title search', 5),
+    ('reviews list', 20),
+    ('comments list', 10),
+    ('genres list', 5),
+)
+WRITES = (
+    ('create review', 70),
+    ('create comment', 30),
+)
+
+
+def get_percentile(latencies, percent):
+    """Nearest-rank percentile of sorted latencies, in milliseconds."""
+    rank = max(round(len(latencies) * percent / 100) - 1, 0)
+    return latencies[rank] * 1000
+
+
+def sample_ids(model, count, rng):
+    """Ids of up to count random rows, without ORDER BY RANDOM()."""
+    bounds = model.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return []
+    ids = {
+        rng.randint(bounds['low'], bounds['high'])
+        for _ in range(count * 2)
+    }
+    return list(
+        model.objects.filter(pk__in=ids).values_list('pk', flat=True)[:count]
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Send a mix of read and write requests from concurrent clients and '
+        'report throughput and p50/p95/p99 latency per operation'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='requests to send',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='clients sending requests at once',
+        )
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.1,
+            help='share of write requests, 0 for reads only',
+        )
+        parser.add_argument(
+            '--base-url',
+            help='server to load, as http://localhost:8000; by default '
+                 'requests go through the Django test client in process',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed of the request mix',
+        )
+
+    def handle(self, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        self.rng = random.Random(options['seed'])
+        self.base_url = options['base_url']
+        self.local = threading.local()
+        self.prepare(options)
+        plan = self.get_plan(options['requests'], options['write_ratio'])
+        try:
+            results, elapsed = self.run(plan, options['concurrency'])
+        finally:
+            # Reviews and comments of the load users go with them.
+            User.objects.filter(
+                username__startswith=LOADTEST_USER_PREFIX
+            ).delete()
+        self.report(results, elapsed)
+
+    def prepare(self, options):
+        self.titles = sample_ids(Title, 500, self.rng)
+        self.reviews = list(Review.objects.filter(
+            pk__in=sample_ids(Review, 500, self.rng)
+        ).values_list('title_id', 'pk'))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.pages = min(
+            20, Title.objects.count() // settings.REST_FRAMEWORK['PAGE_SIZE']
+        ) or 1
+        if not self.titles or not self.reviews or not self.genres:
+            raise CommandError(
+                'Load data first, for example with generate_catalog'
+            )
+        writes = round(options['requests'] * options['write_ratio'])
+        # A user reviews a title once: every user takes its own titles.
+        self.authors = [
+            User.objects.create(
+                username=f'{LOADTEST_USER_PREFIX}{number}',
+                email=f'{LOADTEST_USER_PREFIX}{number}@yamdb.fake',
+            )
+            for number in range(min(writes, options['concurrency']) or 1)
+        ]
+        self.tokens = {
+            author.pk: str(AccessToken.for_user(author))
+            for author in self.authors
+        }
+        self.reviewed = defaultdict(set)
+
+    def get_plan(self, count, write_ratio):
+        plan = []
+        for _ in range(count):
+            operations = WRITES if self.rng.random() < write_ratio else READS
+            names, weights = zip(*operations)
+            plan.append(self.rng.choices(names, weights)[0])
+        return plan
+
+    def get_request(self, operation, rng):
+        """Method, path, body and author of one request."""
+        title_id = rng.choice(self.titles)
+        review_title_id, review_id = rng.choice(self.reviews)
+        reads = {
+            'titles list': (
+                f'/api/v1/titles/?page={rng.randint(1, self.pages)}'
+            ),
+            'titles by genre': (
+                f'/api/v1/titles/?genre={rng.choice(self.genres)}'
+            ),
+            'title': f'/api/v1/titles/{title_id}/',
+            'title search': '/api/v1/titles/?search=сюжет',
+            'reviews list': f'/api/v1/titles/{review_title_id}/reviews/',
+            'comments list': (
+                f'/api/v1/titles/{review_title_id}/reviews/{review_id}/'
+                'comments/'
+            ),
+            'genres list': '/api/v1/genres/',
+        }
+        if operation in reads:
+            return 'get', reads[operation], None, None
+        author = rng.choice(self.authors)
+        if operation == 'create comment':
+            return 'post', (
+                f'/api/v1/titles/{review_title_id}/reviews/{review_id}/'
+                'comments/'
+            ), {'text': 'Комментарий нагрузки'}, author
+        title_id = next(
+            (pk for pk in rng.sample(self.titles, len(self.titles))
+             if pk not in self.reviewed[author.pk]),
+            title_id,
+        )
+        self.reviewed[author.pk].add(title_id)
+        return 'post', f'/api/v1/titles/{title_id}/reviews/', {
+            'text': 'Отзыв нагрузки', 'score': rng.randint(1, 10)
+        }, author
+
+    def send(self, method, path, body, author):
+        """Send a request, return its status code."""
+        headers = {}
+        if author is not None:
+            headers['Authorization'] = f'Bearer {self.tokens[author.pk]}'
+        if self.base_url is None:
+            client = getattr(self.local, 'client', None)
+            if client is None:
+                client = self.local.client = Client()
+            extra = {f'HTTP_{name.upper()}': value
+                     for name, value in headers.items()}
+            if body is None:
+                return getattr(client, method)(path, **extra).status_code
+            return getattr(client, method)(
+                path, json.dumps(body), content_type='application/json',
+                **extra
+            ).status_code
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(
+            self.base_url.rstrip('/') + urllib.parse.quote(path, safe='/?=&'),
+            data=data, headers=headers, method=method.upper(),
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def run(self, plan, concurrency):
+        lock = threading.Lock()
+        # Requests are drawn up front, so the mix does not depend on
+        # thread scheduling.
+        requests = [
+            (operation, self.get_request(operation, self.rng))
+            for operation in plan
+        ]
+
+        def send(item):
+            operation, request = item
+            started = time.perf_counter()
+            try:
+                status = self.send(*request)
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                results[operation].append((elapsed, status))
+
+        results = defaultdict(list)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send, requests))
+        return results, time.perf_counter() - started
+
+    def report(self, results, elapsed):
+        total = sum(len(items) for items in results.values())
+        self.stdout.write(
+            f'{total} requests in {elapsed:.2f}s: '
+            f'{total / elapsed:.0f} req/s'
+        )
+        everything = []
+        for operation in sorted(results):
+            items = results[operation]
+            everything.extend(items)
+            self.stdout.write(self.format_line(operation, items, elapsed))
+        self.stdout.write(self.format_line('all', everything, elapsed))
+
+    @staticmethod
+    def format_line(name, items, elapsed):
+        latencies = sorted(seconds for seconds, _ in items)
+        errors = sum(
+            1 for _, status in items if status is None or status >= 400
+        )
+        return (
+            f'  {name}: {len(items)} requests, {errors} errors, '
+            f'{len(items) / elapsed:.0f} req/s, '
+            f'p50 {get_percentile(latencies, 50):.1f} ms, '
+            f'p95 {get_percentile(latencies, 95):.1f} ms, '
+            f'p99 {get_percentile(latencies, 99):.1f} ms'
+        )
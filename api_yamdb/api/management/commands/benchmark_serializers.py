@@ -0,0 +1,126 @@
+import time
+
+from api.fastpath import (CommentFastListMixin, ReviewFastListMixin,
+                          TitleFastListMixin)
+from api.renderers import FastJSONRenderer
+from api.serializers import (CommentSerializer, GetTitleSerializer,
+                             ReviewSerializer)
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def measure(function, repeat):
+    """Best time of repeated runs, in seconds."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare serializers with .values() rows, and JSONRenderer with '
+        'FastJSONRenderer, in ms per 1000 objects (rolled back test data)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--objects',
+            type=int,
+            default=1000,
+            help='objects of every model to serialize',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='runs to take the best time of',
+        )
+
+    def create_objects(self, count):
+        """Add count titles with two genres, reviews and comments."""
+        category = Category.objects.create(name='Бенчмарк', slug='bench')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'bench-{number}')
+            for number in range(2)
+        ]
+        author = User.objects.create(
+            username='bench-author', email='bench-author@example.com'
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Бенчмарк {number}', year=2000, category=category,
+                  description='Описание ' * 20)
+            for number in range(count)
+        )
+        titles = list(Title.objects.filter(category=category))
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles for genre in genres
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв ' * 20, score=7)
+            for title in titles
+        )
+        review = Review.objects.filter(author=author).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий ' * 10)
+            for _ in range(count)
+        )
+        return review.pk
+
+    def handle(self, **options):
+        count, repeat = options['objects'], options['repeat']
+        with transaction.atomic():
+            review_id = self.create_objects(count)
+            cases = (
+                ('titles', GetTitleSerializer, TitleFastListMixin,
+                 Title.objects.filter(category__slug='bench').select_related(
+                     'category'
+                 ).prefetch_related('genre').order_by('id')),
+                ('reviews', ReviewSerializer, ReviewFastListMixin,
+                 Review.objects.filter(
+                     author__username='bench-author'
+                 ).select_related('author').order_by('id')),
+                ('comments', CommentSerializer, CommentFastListMixin,
+                 Comment.objects.filter(
+                     review_id=review_id
+                 ).select_related('author').order_by('id')),
+            )
+            for case in cases:
+                self.compare(*case, repeat=repeat)
+            transaction.set_rollback(True)
+
+    def compare(self, name, serializer_class, fast_class, queryset, repeat):
+        """Time queryset to data and data to JSON, both ways."""
+        keys = list(serializer_class().fields)
+        lookups = {'id'}
+        for key in keys:
+            lookups.update(fast_class.row_lookups[key])
+        values = queryset.prefetch_related(None).values(*lookups)
+        fast = fast_class()
+        data = serializer_class(queryset, many=True).data
+        scale = 1000 / len(data) * 1000
+        timings = (
+            ('serializer', measure(
+                lambda: serializer_class(queryset.all(), many=True).data,
+                repeat,
+            )),
+            ('values rows', measure(
+                lambda: fast.get_rows(list(values.all()), keys), repeat
+            )),
+            ('JSONRenderer', measure(
+                lambda: JSONRenderer().render(data), repeat
+            )),
+            ('FastJSONRenderer', measure(
+                lambda: FastJSONRenderer().render(data), repeat
+            )),
+        )
+        self.stdout.write(f'{name} ({len(data)} objects):')
+        for label, seconds in timings:
+            self.stdout.write(f'  {label}: {seconds * scale:.2f} ms per 1k')
@@ -0,0 +1,76 @@
+from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+                       ReviewViewSet, TitleViewSet, UserViewSet)
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+from reviews.models import Review, Title
+
+
+def get_endpoint_queryset(viewset, query, **kwargs):
+    """Return filtered queryset of the first list page of an endpoint."""
+    view = viewset(
+        action_map={'get': 'list'}, kwargs=kwargs, format_kwarg=None
+    )
+    view.request = view.initialize_request(
+        APIRequestFactory().get('/', query)
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset[:view.paginator.page_size]
+
+
+class Command(BaseCommand):
+    help = 'Print EXPLAIN of the main query of every list endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='run the queries and show real timings (PostgreSQL)',
+        )
+
+    def handle(self, **options):
+        review = Review.objects.select_related(
+            'title__category', 'author'
+        ).order_by('id').first()
+        if review is None:
+            raise CommandError('Load data first: EXPLAIN needs a review')
+        title = review.title
+        genre = title.genre.first()
+        endpoints = (
+            ('titles', TitleViewSet, {}, {}),
+            ('titles?year', TitleViewSet, {'year': title.year}, {}),
+            ('titles?name', TitleViewSet, {'name': title.name}, {}),
+            ('titles?ordering=-rating', TitleViewSet,
+             {'ordering': '-rating'}, {}),
+            ('titles?year__gte', TitleViewSet,
+             {'year__gte': title.year, 'ordering': '-year'}, {}),
+            ('titles?reviews_count__gte', TitleViewSet,
+             {'reviews_count__gte': 1, 'ordering': '-reviews_count'}, {}),
+            ('titles?search', TitleViewSet,
+             {'search': title.name.split()[0]}, {}),
+            ('titles?category', TitleViewSet,
+             {'category': title.category.slug if title.category else ''},
+             {}),
+            ('titles?genre', TitleViewSet,
+             {'genre': genre.slug if genre else ''}, {}),
+            ('reviews', ReviewViewSet, {}, {'title_id': title.pk}),
+            ('comments', CommentViewSet, {},
+             {'title_id': title.pk, 'review_id': review.pk}),
+            ('categories?search', CategoryViewSet,
+             {'search': title.category.name[1:3]
+              if title.category else ''}, {}),
+            ('genres?search', GenreViewSet,
+             {'search': genre.name[1:3] if genre else ''}, {}),
+            ('users?search', UserViewSet,
+             {'search': review.author.username[1:4]}, {}),
+        )
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for name, viewset, query, kwargs in endpoints:
+            queryset = get_endpoint_queryset(viewset, query, **kwargs)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
+        self.stdout.write(
+            f'Titles: {Title.objects.count()}, '
+            f'reviews of the sample title: {title.reviews.count()}'
+        )
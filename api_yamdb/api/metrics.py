@@ -0,0 +1,257 @@
+"""Request, DB and cache metrics in the Prometheus text format.
+
+Every worker process counts in memory. With METRICS_DIR set, workers
+write their counters to METRICS_DIR/<pid>.json at most every
+METRICS_FLUSH_INTERVAL seconds, and /metrics sums the files of all
+workers, so any worker can answer a scrape.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from api.cache import get_stats
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """Counters of one process, keyed by label tuples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flushed = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        # (view, action, method, status) -> count
+        self.requests = defaultdict(int)
+        # (view, action) -> bucket counts, then sum and count
+        self.durations = defaultdict(lambda: [0] * len(BUCKETS) + [0.0, 0])
+        # (view, action) -> query count and seconds
+        self.queries = defaultdict(lambda: [0, 0.0])
+
+    def observe(self, view, action, method, status, seconds, queries,
+                query_seconds):
+        with self.lock:
+            self.requests[(view, action, method, status)] += 1
+            duration = self.durations[(view, action)]
+            for number, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    duration[number] += 1
+                    break
+            duration[-2] += seconds
+            duration[-1] += 1
+            db = self.queries[(view, action)]
+            db[0] += queries
+            db[1] += query_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': [[*key, value]
+                             for key, value in self.requests.items()],
+                'durations': [[*key, value]
+                              for key, value in self.durations.items()],
+                'queries': [[*key, value]
+                            for key, value in self.queries.items()],
+            }
+
+    def flush(self, force=False):
+        """Write the snapshot for other workers, if it is time to."""
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not directory or (
+            not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(path, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+registry = Registry()
+atexit.register(registry.flush, force=True)
+
+
+def merge(snapshots):
+    """Sum snapshots of several processes."""
+    requests = defaultdict(int)
+    durations = defaultdict(lambda: [0] * len(BUCKETS) + [0.0, 0])
+    queries = defaultdict(lambda: [0, 0.0])
+    for snapshot in snapshots:
+        for *key, value in snapshot['requests']:
+            requests[tuple(key)] += value
+        for *key, value in snapshot['durations']:
+            total = durations[tuple(key)]
+            for number, item in enumerate(value):
+                total[number] += item
+        for *key, value in snapshot['queries']:
+            total = queries[tuple(key)]
+            total[0] += value[0]
+            total[1] += value[1]
+    return requests, durations, queries
+
+
+def collect():
+    """Snapshots of this process and of the files of other workers."""
+    snapshots = [registry.snapshot()]
+    directory = settings.METRICS_DIR
+    if not directory or not os.path.isdir(directory):
+        return snapshots
+    own = f'{os.getpid()}.json'
+    for name in os.listdir(directory):
+        if name == own or not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def labels(**values):
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in values.items()
+    ) + '}'
+
+
+def render():
+    requests, durations, queries = merge(collect())
+    lines = [
+        '# HELP yamdb_http_requests_total Requests by view, action, '
+        'method and status.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    for (view, action, method, status), value in sorted(requests.items()):
+        lines.append(
+            'yamdb_http_requests_total'
+            f'{labels(view=view, action=action, method=method, status=status)}'
+            f' {value}'
+        )
+    lines += [
+        '# HELP yamdb_http_request_duration_seconds Request latency.',
+        '# TYPE yamdb_http_request_duration_seconds histogram',
+    ]
+    for (view, action), value in sorted(durations.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, value):
+            cumulative += count
+            lines.append(
+                'yamdb_http_request_duration_seconds_bucket'
+                f'{labels(view=view, action=action, le=bound)} {cumulative}'
+            )
+        name = 'yamdb_http_request_duration_seconds'
+        lines += [
+            f'{name}_bucket{labels(view=view, action=action, le="+Inf")} '
+            f'{value[-1]}',
+            f'{name}_sum{labels(view=view, action=action)} {value[-2]}',
+            f'{name}_count{labels(view=view, action=action)} {value[-1]}',
+        ]
+    lines += [
+        '# HELP yamdb_db_queries_total SQL queries run by requests.',
+        '# TYPE yamdb_db_queries_total counter',
+    ]
+    for (view, action), value in sorted(queries.items()):
+        lines.append(
+            f'yamdb_db_queries_total{labels(view=view, action=action)} '
+            f'{value[0]}'
+        )
+    lines += [
+        '# HELP yamdb_db_query_seconds_total Time spent in SQL queries.',
+        '# TYPE yamdb_db_query_seconds_total counter',
+    ]
+    for (view, action), value in sorted(queries.items()):
+        lines.append(
+            f'yamdb_db_query_seconds_total{labels(view=view, action=action)} '
+            f'{value[1]}'
+        )
+    lines += [
+        '# HELP yamdb_response_cache_total Response cache lookups.',
+        '# TYPE yamdb_response_cache_total counter',
+    ]
+    for group, stats in get_stats().items():
+        for result, value in stats.items():
+            lines.append(
+                f'yamdb_response_cache_total'
+                f'{labels(group=group, result=result)} {value}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def get_view_labels(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', ''
+    view = match.func
+    cls = getattr(view, 'cls', None)
+    actions = getattr(view, 'actions', None) or {}
+    return (
+        cls.__name__ if cls else match.url_name or view.__name__,
+        actions.get(request.method.lower(), ''),
+    )
+
+
+class QueryTimer:
+    """Execute wrapper counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Count requests, latency and DB work per resolved view and action."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        view, action = get_view_labels(request)
+        registry.observe(
+            view, action, request.method, response.status_code,
+            time.perf_counter() - started, timer.count, timer.seconds,
+        )
+        registry.flush()
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, behind METRICS_TOKEN when it is set."""
+    token = settings.METRICS_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,32 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination over the default -id ordering."""
+
+    ordering = '-id'
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Page number pagination, keyset pagination when ?cursor is given.
+
+    Keyset pages skip COUNT(*) and OFFSET, so a deep page costs as much
+    as the first one. Pass an empty ?cursor= to get the first page.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_pagination_class = IdCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -21,7 +21,7 @@ class IsAdminOrModeratirOrAuthor(BasePermission):
             request.method in SAFE_METHODS
             or request.user.is_admin
             or request.user.is_moderator
-            or request.user == obj.author
+            or request.user.id == obj.author_id
             or request.user.is_superuser
         )
 
@@ -1,10 +1,13 @@
 from datetime import datetime
 
+from api.fieldsets import SparseFieldsetSerializerMixin
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (SCORES, Category, Comment, Genre, LeaderboardEntry,
+                            Review, ScoreStats, Title)
 from users.models import User
 
 
@@ -58,18 +61,21 @@ class SignUpSerializer(serializers.ModelSerializer):
         return username
 
     def validate(self, data):
-        user = User.objects.filter(email=data["email"])
-        if user:
-            if user[0].username != data["username"]:
+        """Find the user the request signs up again, in one query."""
+        self.user = None
+        users = User.objects.filter(
+            Q(email=data['email']) | Q(username=data['username'])
+        )
+        for user in users[:2]:
+            if user.username != data['username']:
                 raise serializers.ValidationError(
                     'User with this email has allready exists'
                 )
-        user = User.objects.filter(username=data["username"])
-        if user:
-            if user[0].email != data["email"]:
+            if user.email != data['email']:
                 raise serializers.ValidationError(
                     'User has allready exists with another email'
                 )
+            self.user = user
         return data
 
 
@@ -82,8 +88,8 @@ class TokenSerializer(serializers.ModelSerializer):
     )
 
     def validate(self, data):
-        user = get_object_or_404(User, username=data["username"])
-        if data["confirmation_code"] != user.confirmation_code:
+        self.user = get_object_or_404(User, username=data["username"])
+        if data["confirmation_code"] != self.user.confirmation_code:
             raise serializers.ValidationError(
                 'Bad confirmation code'
             )
@@ -104,9 +110,35 @@ class AuthorSerializer(serializers.ModelSerializer):
         read_only_fields = ('role',)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class PublicUserSerializer(serializers.ModelSerializer):
+    """Author of a review or comment, for ?expand=author.
+
+    Only the username: the rest of the profile is for admins and the
+    user, and renames are the only user writes that move title stamps.
+    """
+
+    class Meta:
+        model = User
+        fields = ('username',)
+
+
+class TitleBriefSerializer(serializers.ModelSerializer):
+    """Title of a review, for ?expand=title."""
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'rating')
+
+
+class ReviewSerializer(SparseFieldsetSerializerMixin,
+                       serializers.ModelSerializer):
     """Serializer for Review model."""
 
+    expandable_fields = {
+        'author': PublicUserSerializer,
+        'title': TitleBriefSerializer,
+    }
+
     author = SlugRelatedField(
         slug_field='username',
         queryset=User.objects.all(),
@@ -129,9 +161,12 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     """Serializer for Comment model."""
 
+    expandable_fields = {'author': PublicUserSerializer}
+
     author = SlugRelatedField(
         slug_field='username',
         queryset=User.objects.all(),
@@ -184,14 +219,76 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class GetTitleSerializer(serializers.ModelSerializer):
-    """Serializer for Title model with method GET."""
+class TitleBatchItemSerializer(TitleSerializer):
+    """Fields of one title in a batch, checked without queries.
+
+    Slugs, ids and name uniqueness are checked for the whole batch at
+    once in api.batch.
+    """
+
+    id = serializers.IntegerField(required=False, min_value=1)
+    name = serializers.CharField(max_length=256)
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+
+class GetTitleSerializer(SparseFieldsetSerializerMixin,
+                         serializers.ModelSerializer):
+    """Serializer for Title model with method GET.
+
+    Category and genres are nested unless ?expand= leaves them out,
+    then they are rendered as slugs.
+    """
 
     rating = serializers.IntegerField(read_only=True)
-    category = CategorySerializer()
-    genre = GenreSerializer(many=True)
+    category = SlugRelatedField(slug_field='slug', read_only=True)
+    genre = SlugRelatedField(slug_field='slug', read_only=True, many=True)
+
+    expandable_fields = {
+        'category': CategorySerializer,
+        'genre': GenreSerializer,
+    }
+    default_expand = ('category', 'genre')
 
     class Meta:
         fields = ('id', 'name', 'year', 'description', 'category', 'genre',
                   'rating')
         model = Title
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Title at a position of a leaderboard."""
+    title = TitleBriefSerializer()
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('position', 'score', 'title')
+
+
+class HistogramField(serializers.Field):
+    """Review counts of scores 1-10 as {"1": count, ...}."""
+
+    def to_representation(self, value):
+        return dict(zip(map(str, SCORES), value))
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Score distribution of a title."""
+    reviews_count = serializers.IntegerField(source='score_count')
+    histogram = HistogramField(read_only=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'reviews_count', 'rating', 'bayesian_rating',
+                  'histogram')
+
+
+class ScoreStatsSerializer(serializers.ModelSerializer):
+    """Score distribution of the catalog, a category or a genre."""
+    mean = serializers.FloatField(read_only=True)
+    histogram = HistogramField(read_only=True)
+
+    class Meta:
+        model = ScoreStats
+        fields = ('titles_count', 'reviews_count', 'mean', 'histogram',
+                  'updated')
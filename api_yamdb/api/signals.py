@@ -0,0 +1,39 @@
+from api.authentication import invalidate_user
+from api.cache import GROUPS, invalidate
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import catalog_reloaded
+from users.models import User
+
+# Cached response groups that render data of each model.
+INVALIDATED_GROUPS = {
+    Title: ('titles',),
+    Review: ('titles',),
+    Category: ('titles', 'categories'),
+    Genre: ('titles', 'genres'),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_on_write(sender, **kwargs):
+    groups = INVALIDATED_GROUPS.get(sender)
+    if groups:
+        invalidate(*groups)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_on_genre_change(sender, **kwargs):
+    invalidate('titles')
+
+
+@receiver(catalog_reloaded)
+def invalidate_on_reload(sender, **kwargs):
+    invalidate(*GROUPS)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
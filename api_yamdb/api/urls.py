@@ -1,8 +1,10 @@
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+from api.views import (CacheStatsView, CategoryViewSet, CommentViewSet,
+                       GenreViewSet, LeaderboardView, MailStatsView,
                        ReviewViewSet, TitleViewSet, TokenViewSet,
                        UserSignUpViewSet, UserViewSet)
 from django.urls import include, path
 from rest_framework import routers
+from reviews.leaderboards import TRENDING
 
 router = routers.DefaultRouter()
 router.register(r'titles', TitleViewSet)
@@ -23,5 +25,19 @@ router.register(
 urlpatterns = [
     path('v1/auth/signup/', UserSignUpViewSet.as_view({'post': 'create'})),
     path('v1/auth/token/', TokenViewSet.as_view({'post': 'create'})),
+    path('v1/cache/stats/', CacheStatsView.as_view()),
+    path('v1/mail/stats/', MailStatsView.as_view()),
+    path('v1/leaderboards/top/', LeaderboardView.as_view()),
+    path(
+        'v1/leaderboards/top/categories/<slug:category>/',
+        LeaderboardView.as_view(),
+    ),
+    path(
+        'v1/leaderboards/top/genres/<slug:genre>/',
+        LeaderboardView.as_view(),
+    ),
+    path(
+        'v1/leaderboards/trending/', LeaderboardView.as_view(board=TRENDING)
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -1,24 +1,42 @@
+from api.batch import write_titles
+from api.cache import CachedResponseMixin, CachedRetrieveMixin, get_stats
+from api.conditional import ConditionalGetMixin
+from api.fastpath import (CommentFastListMixin, ReviewFastListMixin,
+                          TitleFastListMixin)
+from api.fieldsets import SparseFieldsetMixin
+from api.filters import TitleFilter
+from api.mail import enqueue_mail, get_mail_queue
+from api.pagination import OptionalCursorPagination
 from api.permissions import (IsAdminOrModeratirOrAuthor, IsAdminOrReadOnly,
                              IsAdminOrSuperuser)
 from api.serializers import (AuthorSerializer, CategorySerializer,
                              CommentSerializer, GenreSerializer,
-                             GetTitleSerializer, ReviewSerializer,
+                             GetTitleSerializer, LeaderboardEntrySerializer,
+                             ReviewSerializer, ScoreStatsSerializer,
                              SignUpSerializer, TitleSerializer,
-                             TokenSerializer, UserSerializer)
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+                             TitleStatsSerializer, TokenSerializer,
+                             UserSerializer)
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils.crypto import get_random_string
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, status, viewsets
+from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews import leaderboards
+from reviews.models import (HISTOGRAM_FIELDS, Category, Comment, Genre,
+                            LeaderboardEntry, Review, ScoreStats, Title)
+from reviews.search import search_titles
 from users.models import User
 
+CONFIRMATION_CODE_LENGTH = 32
+
 
 class UserSignUpViewSet(viewsets.ModelViewSet):
     """ViewClass for user registration."""
@@ -32,14 +50,24 @@ class UserSignUpViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         email = serializer.validated_data.get('email')
-        user, created = User.objects.get_or_create(
-            username=username,
-            email=email,
-        )
-        confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = confirmation_code
-        user.save()
-        send_mail(
+        confirmation_code = get_random_string(CONFIRMATION_CODE_LENGTH)
+        user = serializer.user
+        if user is not None:
+            user.confirmation_code = confirmation_code
+            user.save(update_fields=['confirmation_code'])
+        else:
+            try:
+                with transaction.atomic():
+                    User.objects.create(
+                        username=username,
+                        email=email,
+                        confirmation_code=confirmation_code,
+                    )
+            except IntegrityError:
+                raise ValidationError(
+                    'User with this username or email has allready exists'
+                )
+        enqueue_mail(
             subject='Код подтверждения',
             message=f'{username}, код подтверждения: {confirmation_code}',
             from_email='confirmation_code@example.com',
@@ -58,9 +86,7 @@ class TokenViewSet(viewsets.ModelViewSet):
     def create(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = serializer.validated_data.get('username')
-        user = get_object_or_404(User, username=username)
-        refresh = RefreshToken.for_user(user)
+        refresh = RefreshToken.for_user(serializer.user)
         return Response(
             {'access': str(refresh.access_token)},
             status=status.HTTP_200_OK
@@ -84,12 +110,10 @@ class UserViewSet(viewsets.ModelViewSet):
         methods=['get', 'patch']
     )
     def me(self, request):
+        user = get_object_or_404(User, id=request.user.id)
         if request.method == 'GET':
-            user = get_object_or_404(User, id=request.user.id)
-            serializer = UserSerializer(user)
-            return Response(serializer.data)
+            return Response(UserSerializer(user).data)
         if request.method == 'PATCH':
-            user = get_object_or_404(User, id=request.user.id)
             if request.user.is_admin:
                 serializer = UserSerializer(
                     user, data=request.data, partial=True
@@ -108,17 +132,30 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin, SparseFieldsetMixin, ReviewFastListMixin,
+    viewsets.ModelViewSet
+):
     """Viewset for Review model."""
 
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAdminOrModeratirOrAuthor,
     )
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        queryset = self.only_rendered(
+            Review.objects.filter(title_id=self.kwargs.get('title_id')),
+            ('author', 'title', 'text', 'score', 'pub_date'),
+        )
+        if self.is_rendered('author'):
+            queryset = queryset.select_related('author')
+        if self.is_rendered('title') and 'title' in self.get_expanded_fields(
+            ReviewSerializer
+        ):
+            queryset = queryset.select_related('title')
+        return queryset
 
     def perform_create(self, serializer):
         title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
@@ -131,51 +168,151 @@ class ReviewViewSet(viewsets.ModelViewSet):
         }
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin, SparseFieldsetMixin, CommentFastListMixin,
+    viewsets.ModelViewSet
+):
     """Viewset for Comment model."""
 
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAdminOrModeratirOrAuthor,
     )
+    pagination_class = OptionalCursorPagination
+
+    def get_stamp_queryset(self, title_id):
+        return Title.objects.filter(
+            pk=title_id, reviews=self.kwargs.get('review_id')
+        )
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        queryset = self.only_rendered(
+            Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            ),
+            ('author', 'review', 'text', 'pub_date'),
+        )
+        if self.is_rendered('author'):
+            queryset = queryset.select_related('author')
+        return queryset
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+        review = get_object_or_404(
+            Review,
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
         serializer.save(author=self.request.user, review=review)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin, CachedRetrieveMixin, SparseFieldsetMixin,
+    TitleFastListMixin, viewsets.ModelViewSet
+):
     """ViewClass for Title."""
+    cache_group = 'titles'
+    title_url_kwarg = 'pk'
     queryset = Title.objects.all()
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
-    filterset_fields = ("name", "year")
+    filterset_class = TitleFilter
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return GetTitleSerializer
         return TitleSerializer
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Create and update a list of titles, with a result per item."""
+        if not isinstance(request.data, list):
+            raise ValidationError('Expected a list of titles')
+        if len(request.data) > settings.TITLE_BATCH_MAX_SIZE:
+            raise ValidationError(
+                f'Batch is limited to {settings.TITLE_BATCH_MAX_SIZE} titles'
+            )
+        return Response(write_titles(request.data))
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Score histogram, review count and Bayesian rating of a title."""
+        title = get_object_or_404(Title.objects.only(
+            'score_count', 'rating', 'bayesian_rating', *HISTOGRAM_FIELDS
+        ), pk=pk)
+        return Response(TitleStatsSerializer(title).data)
+
+    @action(detail=False, url_path='stats', url_name='catalog-stats')
+    def catalog_stats(self, request):
+        """Score distribution of all titles, see ScoreStats."""
+        stats = get_object_or_404(ScoreStats, scope=ScoreStats.ALL)
+        return Response(ScoreStatsSerializer(stats).data)
+
     def get_queryset(self):
         self.serializer_class = GetTitleSerializer
-        queryset = Title.objects.order_by("id").annotate(
-            rating=Avg("reviews__score")
+        queryset = self.only_rendered(
+            Title.objects.order_by("id"),
+            ("name", "year", "description", "category", "rating"),
         )
-        category = self.request.query_params.get('category')
-        genre = self.request.query_params.get('genre')
-        for key, value in self.request.query_params.items():
-            if key == "category":
-                queryset = queryset.filter(category__slug=category)
-            elif key == "genre":
-                queryset = queryset.filter(genre__slug=genre)
+        if self.is_rendered("category"):
+            queryset = queryset.select_related("category")
+        if self.is_rendered("genre"):
+            queryset = queryset.prefetch_related("genre")
+        if "search" in self.request.query_params:
+            queryset = search_titles(
+                queryset, self.request.query_params["search"]
+            )
         return queryset
 
 
+class CacheStatsView(APIView):
+    """Hit and miss counters of the response cache."""
+    permission_classes = (IsAdminOrSuperuser,)
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class MailStatsView(APIView):
+    """Queue depth, delivery counters and latency of this process."""
+    permission_classes = (IsAdminOrSuperuser,)
+
+    def get(self, request):
+        return Response(get_mail_queue().get_stats())
+
+
+class LeaderboardView(generics.ListAPIView):
+    """Page of a precomputed leaderboard, see reviews.leaderboards.
+
+    The board is TOP, or the one of the category or genre slug of the
+    url, unless board is given to as_view().
+    """
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = (AllowAny,)
+    filter_backends = ()
+    board = leaderboards.TOP
+
+    def get_board(self):
+        if 'category' in self.kwargs:
+            return leaderboards.category_board(get_object_or_404(
+                Category.objects.only('id'), slug=self.kwargs['category']
+            ).pk)
+        if 'genre' in self.kwargs:
+            return leaderboards.genre_board(get_object_or_404(
+                Genre.objects.only('id'), slug=self.kwargs['genre']
+            ).pk)
+        return self.board
+
+    def get_queryset(self):
+        return LeaderboardEntry.objects.filter(
+            board=self.get_board()
+        ).select_related('title').only(
+            'position', 'score', 'title__id', 'title__name', 'title__year',
+            'title__rating',
+        ).order_by('position')
+
+
 class CreateDestroyListViewSet(
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -186,21 +323,42 @@ class CreateDestroyListViewSet(
     pass
 
 
-class CategoryViewSet(CreateDestroyListViewSet):
+class ScoreStatsMixin:
+    """Score distribution of the titles of an object at <slug>/stats/.
+
+    Stats are rebuilt by the rebuild_ratings command, get_scope gives
+    the ScoreStats scope of an object id.
+    """
+    get_scope = None
+
+    @action(detail=True)
+    def stats(self, request, slug=None):
+        obj = get_object_or_404(self.queryset.only('id'), slug=slug)
+        stats = get_object_or_404(ScoreStats, scope=self.get_scope(obj.pk))
+        return Response(ScoreStatsSerializer(stats).data)
+
+
+class CategoryViewSet(CachedResponseMixin, ScoreStatsMixin,
+                      CreateDestroyListViewSet):
     """ViewClass for Category."""
+    cache_group = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    get_scope = staticmethod(ScoreStats.category_scope)
 
 
-class GenreViewSet(CreateDestroyListViewSet):
+class GenreViewSet(CachedResponseMixin, ScoreStatsMixin,
+                   CreateDestroyListViewSet):
     """ViewClass for Genre."""
+    cache_group = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
+    get_scope = staticmethod(ScoreStats.genre_scope)
@@ -9,7 +9,7 @@ load_dotenv(find_dotenv())
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv('MY_KEY', default=1)
+SECRET_KEY = os.getenv('MY_KEY', default='1')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -133,12 +134,73 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ]
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Workers share request metrics through files in METRICS_DIR, without it
+# /metrics shows the counters of the worker that answers the scrape.
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', default=5))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# Title, review and comment lists are built from .values() rows.
+FAST_LIST_RESPONSES = os.getenv('FAST_LIST_RESPONSES', default='1') == '1'
+
+# Cache. LocMemCache is per process: with several workers use a shared
+# backend (file, memcached or django_redis) so writes reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=10000)),
+        },
+    }
+}
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+USER_CACHE_ALIAS = 'default'
+# A role change or delete drops the cached token user in this process
+# only, unless the cache is shared: keep LocMemCache entries short.
+USER_CACHE_TIMEOUT = int(os.getenv(
+    'USER_CACHE_TIMEOUT',
+    default=10 if CACHES[USER_CACHE_ALIAS]['BACKEND'].endswith('LocMemCache')
+    else 300,
+))
+
+# Leaderboards are rebuilt by the refresh_leaderboards command (cron).
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', default=100))
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', default=1))
+LEADERBOARD_TRENDING_DAYS = int(os.getenv('LEADERBOARD_TRENDING_DAYS', default=7))
+LEADERBOARD_TRENDING_HALF_LIFE = float(os.getenv('LEADERBOARD_TRENDING_HALF_LIFE', default=2))
+
+# Title Bayesian rating: the catalog mean score weighs as many reviews.
+# The mean is refreshed by the rebuild_ratings command.
+BAYESIAN_PRIOR_WEIGHT = int(os.getenv('BAYESIAN_PRIOR_WEIGHT', default=10))
+BAYESIAN_PRIOR_MEAN = float(os.getenv('BAYESIAN_PRIOR_MEAN', default=5.5))
+
+# Most titles one POST /api/v1/titles/batch/ may create or update.
+TITLE_BATCH_MAX_SIZE = int(os.getenv('TITLE_BATCH_MAX_SIZE', default=1000))
+
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', default='django.core.mail.backends.filebased.EmailBackend')
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_HOST = os.getenv('EMAIL_HOST', default='localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', default=25))
+
+# Signup mail is sent by background threads of each worker process,
+# MAIL_QUEUE_WORKERS=0 sends it inside the request.
+MAIL_QUEUE_WORKERS = int(os.getenv('MAIL_QUEUE_WORKERS', default=2))
+MAIL_QUEUE_BATCH_SIZE = int(os.getenv('MAIL_QUEUE_BATCH_SIZE', default=50))
+MAIL_QUEUE_BATCH_WAIT = float(os.getenv('MAIL_QUEUE_BATCH_WAIT', default=0.5))
+MAIL_QUEUE_RETRIES = int(os.getenv('MAIL_QUEUE_RETRIES', default=3))
+MAIL_QUEUE_RETRY_DELAY = float(os.getenv('MAIL_QUEUE_RETRY_DELAY', default=1.0))
+MAIL_QUEUE_SHUTDOWN_TIMEOUT = float(os.getenv('MAIL_QUEUE_SHUTDOWN_TIMEOUT', default=10.0))
+MAIL_DEAD_LETTER_FILE = os.path.join(BASE_DIR, 'sent_emails', 'dead_letters.ndjson')
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
@@ -0,0 +1,107 @@
+"""Precomputed top rated and trending titles.
+
+Boards are stored as LeaderboardEntry rows, at most LEADERBOARD_SIZE per
+board, and rewritten by refresh(), run by the refresh_leaderboards
+command. Reading a page of a board is a range of the unique
+(board, position) index, whatever the size of the catalog.
+
+Board keys:
+    top            titles with the best mean score
+    category:<id>  the same within a category
+    genre:<id>     the same within a genre
+    trending       titles with most reviews over the last
+                   LEADERBOARD_TRENDING_DAYS, a review weighing half as
+                   much every LEADERBOARD_TRENDING_HALF_LIFE days
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Category, Genre, LeaderboardEntry, Review, Title
+
+TOP = 'top'
+TRENDING = 'trending'
+# Order of title_mean_rating_idx, unrated titles last on every backend.
+RATING_ORDER = (F('mean_rating').desc(nulls_last=True), '-score_count', 'id')
+
+
+def category_board(category_id):
+    return f'category:{category_id}'
+
+
+def genre_board(genre_id):
+    return f'genre:{genre_id}'
+
+
+def get_rated_titles():
+    return Title.objects.filter(
+        score_count__gte=max(settings.LEADERBOARD_MIN_REVIEWS, 1)
+    ).order_by(*RATING_ORDER)
+
+
+def get_top(queryset):
+    """(title id, score) of the best titles of queryset."""
+    return [
+        (title_id, round(score, 3))
+        for title_id, score in queryset.values_list(
+            'id', 'mean_rating'
+        )[:settings.LEADERBOARD_SIZE]
+    ]
+
+
+def get_trending(now=None):
+    """(title id, score) of the titles with most recent reviews."""
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    half_life = settings.LEADERBOARD_TRENDING_HALF_LIFE
+    scores = defaultdict(float)
+    days = Review.objects.filter(
+        pub_date__gte=now - timedelta(days=settings.LEADERBOARD_TRENDING_DAYS)
+    ).annotate(day=TruncDate('pub_date')).order_by().values_list(
+        'title_id', 'day'
+    ).annotate(count=Count('id'))
+    for title_id, day, count in days:
+        scores[title_id] += count * 0.5 ** ((today - day).days / half_life)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return [
+        (title_id, round(score, 3))
+        for title_id, score in ranked[:settings.LEADERBOARD_SIZE]
+    ]
+
+
+def get_boards(now=None):
+    """Rows of every board, by board key."""
+    boards = {
+        TOP: get_top(get_rated_titles()),
+        TRENDING: get_trending(now),
+    }
+    for category_id in Category.objects.values_list('id', flat=True):
+        boards[category_board(category_id)] = get_top(
+            get_rated_titles().filter(category_id=category_id)
+        )
+    for genre_id in Genre.objects.values_list('id', flat=True):
+        boards[genre_board(genre_id)] = get_top(
+            get_rated_titles().filter(genre=genre_id)
+        )
+    return boards
+
+
+def refresh(now=None):
+    """Rewrite all boards in one transaction, return the number of rows."""
+    boards = get_boards(now)
+    entries = [
+        LeaderboardEntry(
+            board=board, position=position, title_id=title_id, score=score
+        )
+        for board, rows in boards.items()
+        for position, (title_id, score) in enumerate(rows, 1)
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
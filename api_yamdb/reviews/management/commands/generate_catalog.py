@@ -0,0 +1,222 @@
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews.management.commands.import_csv import (BATCH_SIZE, FILES_DICT,
+                                                    copy_rows, finish_load,
+                                                    get_columns,
+                                                    get_table_model,
+                                                    insert_rows, prepare_rows,
+                                                    read_batches)
+
+# Relative frequency of scores 1-10: most reviews are good, with a small
+# bump of angry ones, as on public rating sites.
+SCORE_WEIGHTS = (6, 2, 2, 3, 5, 8, 13, 20, 22, 19)
+WORDS = (
+    'сюжет', 'актёры', 'музыка', 'финал', 'режиссёр', 'темп', 'герой',
+    'диалоги', 'атмосфера', 'камера', 'затянуто', 'сильно', 'слабо',
+    'неожиданно', 'скучно', 'красиво', 'смешно', 'страшно', 'честно',
+)
+
+
+def get_review_counts(titles, reviews, users, skew, rng):
+    """Reviews of every title, Zipf-distributed over titles.
+
+    A title has at most one review per user, so counts above users are
+    cut and the rest is spread over the titles below the cap.
+    """
+    weights = [1 / rank ** skew for rank in range(1, titles + 1)]
+    scale = reviews / sum(weights)
+    counts = [min(users, int(weight * scale)) for weight in weights]
+    missing = reviews - sum(counts)
+    while missing > 0:
+        open_titles = [
+            number for number, count in enumerate(counts) if count < users
+        ]
+        share = max(missing // len(open_titles), 1)
+        for number in open_titles:
+            added = min(share, users - counts[number], missing)
+            counts[number] += added
+            missing -= added
+            if not missing:
+                break
+    rng.shuffle(counts)
+    return counts
+
+
+def get_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic catalog of users, categories, genres, titles, '
+        'reviews and comments through the bulk load path'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 10),
+            ('genres', 30),
+            ('titles', 1000),
+            ('reviews', 20000),
+            ('comments', 5000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'number of {name} to add',
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of reviews per title, 0 for even spread',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='reviews and comments are dated over the last DAYS days',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed, the same seed makes the same catalog',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='rows per INSERT or COPY',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias from DATABASES setting',
+        )
+
+    def handle(self, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be positive')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                'Every user reviews a title once: give at most '
+                '--titles * --users reviews'
+            )
+        self.connection = connections[options['database']]
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.days = options['days']
+        # New rows get ids after the existing ones, names include the id.
+        self.offsets = {
+            prefix: get_table_model(db_table).objects.using(
+                self.connection.alias
+            ).aggregate(last=Max('id'))['last'] or 0
+            for prefix, db_table in FILES_DICT.items()
+        }
+        self.generate(options)
+        finish_load(self.connection, list(FILES_DICT))
+
+    def generate(self, options):
+        users = self.ids('users', options['users'])
+        self.write('users', ('id', 'username', 'email', 'role', 'bio'), (
+            [pk, f'reader{pk}', f'reader{pk}@yamdb.fake', 'user', '']
+            for pk in users
+        ))
+        categories = self.ids('category', options['categories'])
+        self.write('category', ('id', 'name', 'slug'), (
+            [pk, f'Категория {pk}', f'category-{pk}'] for pk in categories
+        ))
+        genres = self.ids('genre', options['genres'])
+        self.write('genre', ('id', 'name', 'slug'), (
+            [pk, f'Жанр {pk}', f'genre-{pk}'] for pk in genres
+        ))
+        titles = self.ids('titles', options['titles'])
+        self.write('titles', (
+            'id', 'name', 'year', 'description', 'category',
+        ), (
+            [pk, f'Произведение {pk}', self.rng.randint(1920, self.now.year),
+             get_text(self.rng, 12), self.rng.choice(categories)]
+            for pk in titles
+        ))
+        self.write('genre_title', ('title', 'genre'), (
+            [title, genre] for title in titles
+            for genre in self.rng.sample(
+                genres, self.rng.randint(1, min(len(genres), 3))
+            )
+        ))
+        reviews = self.ids('review', self.write('review', (
+            'id', 'title', 'author', 'text', 'score', 'pub_date',
+        ), self.review_rows(titles, users, options)))
+        if reviews and options['comments']:
+            self.write('comments', (
+                'id', 'review', 'author', 'text', 'pub_date',
+            ), (
+                [pk, self.rng.choice(reviews), self.rng.choice(users),
+                 get_text(self.rng, 8), self.get_date()]
+                for pk in self.ids('comments', options['comments'])
+            ))
+
+    def review_rows(self, titles, users, options):
+        counts = get_review_counts(
+            len(titles), options['reviews'], len(users), options['skew'],
+            self.rng,
+        )
+        pk = self.offsets['review']
+        for title, count in zip(titles, counts):
+            # Every title has its own quality that moves all its scores.
+            quality = self.rng.gauss(0, 1.5)
+            for author in self.rng.sample(users, count):
+                pk += 1
+                base = self.rng.choices(range(1, 11), SCORE_WEIGHTS)[0]
+                score = min(10, max(1, round(base + quality)))
+                yield [pk, title, author, get_text(self.rng, 20), score,
+                       self.get_date()]
+
+    def ids(self, prefix, count):
+        """Ids of count new rows of the table."""
+        first = self.offsets[prefix] + 1
+        return range(first, first + count)
+
+    def get_date(self):
+        date = self.now - timedelta(
+            seconds=self.rng.random() * self.days * 86400
+        )
+        return self.connection.ops.adapt_datetimefield_value(date)
+
+    def write(self, prefix, header, rows):
+        """Load rows in batches in one transaction, return their number."""
+        db_table = FILES_DICT[prefix]
+        load_rows = (
+            copy_rows if self.connection.vendor == 'postgresql'
+            else insert_rows
+        )
+        columns, defaults, nullable = get_columns(
+            self.connection, db_table, header
+        )
+        started = time.monotonic()
+        written = 0
+        with transaction.atomic(using=self.connection.alias):
+            with self.connection.cursor() as cur:
+                for batch in read_batches(
+                    prepare_rows(rows, defaults, nullable), self.batch_size
+                ):
+                    load_rows(cur, db_table, columns, nullable, batch)
+                    written += len(batch)
+        elapsed = time.monotonic() - started
+        logging.info(
+            f'Generated {written} rows of {db_table} in {elapsed:.2f}s '
+            f'({written / elapsed if elapsed else 0:.0f} rows/sec)'
+        )
+        return written
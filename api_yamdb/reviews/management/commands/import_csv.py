@@ -1,16 +1,32 @@
 import csv
+import gzip
+import io
+import json
 import logging
-import sqlite3
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
+import django
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, IntegrityError,
+                       connections, transaction)
 
-from api_yamdb.settings import BASE_DIR, STATIC_ROOT
+from api_yamdb.settings import STATIC_ROOT
+from reviews.signals import catalog_reloaded
 
-CSV_FILES_DIR = f"{STATIC_ROOT[0]}/data"
+CSV_FILES_DIR = f"{STATIC_ROOT}/data"
+BATCH_SIZE = 5000
+EXPORT_FORMATS = ("csv", "ndjson")
 FILES_DICT = {
     "titles": "reviews_title",
     "category": "reviews_category",
-    "comments": "reviews_comments",
+    "comments": "reviews_comment",
     "genre_title": "reviews_title_genre",
     "genre": "reviews_genre",
     "review": "reviews_review",
@@ -23,11 +39,74 @@ logging.basicConfig(
 )
 
 
-def read_db(prefix):
+def get_table_model(db_table):
+    """Return model (or auto-created m2m model) stored in db table."""
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.db_table == db_table:
+            return model
+    raise KeyError(db_table)
+
+
+def get_columns(connection, db_table, header):
+    """Map csv header to table columns.
+
+    Not null columns absent from the csv get the model field default,
+    returned as values to append to every row. Empty values of nullable
+    columns are loaded as NULL, their indexes are returned last.
+    """
+    model_meta = get_table_model(db_table)._meta
+    fields = [model_meta.get_field(name) for name in header]
+    columns = [field.column for field in fields]
+    nullable = [
+        number for number, field in enumerate(fields) if field.null
+    ]
+    defaults = []
+    for field in model_meta.concrete_fields:
+        if field.column in columns or field.null or field.primary_key:
+            continue
+        columns.append(field.column)
+        defaults.append(
+            field.get_db_prep_save(field.get_default(), connection)
+        )
+    return columns, defaults, nullable
+
+
+def open_file(path, mode='r'):
+    """Open csv or ndjson file as text, gzip-compressed when ends with .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, f'{mode}t', newline='', encoding='utf-8')
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def read_source(source_file, filename):
+    """Return header and iterator of rows of csv or ndjson file."""
+    if '.ndjson' not in filename:
+        csv_data = csv.reader(source_file)
+        return next(csv_data), csv_data
+    records = (json.loads(line) for line in source_file if line.strip())
+    first = next(records, None)
+    if first is None:
+        return [], iter(())
+    header = list(first)
+    return header, (
+        [record[name] for name in header]
+        for record in chain([first], records)
+    )
+
+
+def prepare_rows(rows, defaults, nullable):
+    """Turn empty nullable values into None and append defaults."""
+    for row in rows:
+        for number in nullable:
+            if row[number] == '':
+                row[number] = None
+        yield row + defaults
+
+
+def read_db(connection, prefix):
     """Function for read data from db table."""
     db_table = FILES_DICT[prefix]
-    con = sqlite3.connect(f"{BASE_DIR}/db.sqlite3")
-    cur = con.cursor()
+    cur = connection.cursor()
     cur.execute(f'''
     SELECT *
     FROM {db_table};
@@ -41,56 +120,339 @@ def read_db(prefix):
         return cur
 
 
-def write_to_db(filename, prefix):
+def write_to_db(connection, source_dir, filename, prefix):
     """Function for write data from csv to db table."""
     db_table = FILES_DICT[prefix]
-    con = sqlite3.connect(f"{BASE_DIR}/db.sqlite3")
-    cur = con.cursor()
-    with open(
-            f'{CSV_FILES_DIR}/{filename}', 'r'
-    ) as source_csv_file:
-        csv_data = csv.DictReader(source_csv_file)
-        for number, data in enumerate(csv_data):
-            placeholder = ", ".join(["?"] * len(data))
-            sql_cmd = (
-                "INSERT INTO {table} ({columns}) VALUES({values});".format(
-                    table=db_table,
-                    columns=",".join(data.keys()), values=placeholder)
-            )
-            cur.execute(sql_cmd, list(data.values()))
+    with open_file(
+            os.path.join(source_dir, filename)
+    ) as source_csv_file, connection.cursor() as cur:
+        header, csv_data = read_source(source_csv_file, filename)
+        columns, defaults, nullable = get_columns(
+            connection, db_table, header
+        )
+        placeholder = ", ".join(["%s"] * len(columns))
+        sql_cmd = (
+            "INSERT INTO {table} ({columns}) VALUES({values});".format(
+                table=db_table,
+                columns=",".join(columns), values=placeholder)
+        )
+        for number, data in enumerate(
+                prepare_rows(csv_data, defaults, nullable)
+        ):
+            cur.execute(sql_cmd, data)
             logging.info(
                 f'Successfully write row {number} '
                 f'from 'f'{filename} to table {db_table}!'
             )
-            con.commit()
 
 
-def delete_table(prefix):
+def read_batches(reader, batch_size):
+    """Yield lists of at most batch_size rows from csv reader."""
+    while True:
+        batch = list(islice(reader, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_rows(cur, db_table, columns, nullable, rows):
+    """Load rows with PostgreSQL COPY."""
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    force_null = (
+        f", FORCE_NULL ({','.join(columns[number] for number in nullable)})"
+        if nullable else ""
+    )
+    cur.copy_expert(
+        f"COPY {db_table} ({','.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv{force_null})",
+        buffer,
+    )
+
+
+def insert_rows(cur, db_table, columns, nullable, rows):
+    """Load rows with one executemany INSERT."""
+    placeholder = ", ".join(["%s"] * len(columns))
+    cur.executemany(
+        f"INSERT INTO {db_table} ({','.join(columns)}) "
+        f"VALUES({placeholder});",
+        rows,
+    )
+
+
+def bulk_write_to_db(connection, source_dir, filename, prefix,
+                     batch_size=BATCH_SIZE):
+    """Function for write csv to db table in batches in one transaction."""
+    db_table = FILES_DICT[prefix]
+    load_rows = (
+        copy_rows if connection.vendor == 'postgresql' else insert_rows
+    )
+    started = time.monotonic()
+    total = 0
+    with open_file(
+            os.path.join(source_dir, filename)
+    ) as source_csv_file, transaction.atomic(using=connection.alias):
+        header, csv_data = read_source(source_csv_file, filename)
+        columns, defaults, nullable = get_columns(
+            connection, db_table, header
+        )
+        rows = prepare_rows(csv_data, defaults, nullable)
+        with connection.cursor() as cur:
+            for batch in read_batches(rows, batch_size):
+                load_rows(cur, db_table, columns, nullable, batch)
+                total += len(batch)
+                logging.debug(f'Loaded {total} rows to {db_table}')
+    elapsed = time.monotonic() - started
+    logging.info(
+        f'Successfully write {total} rows from {filename} to table '
+        f'{db_table} in {elapsed:.2f}s '
+        f'({total / elapsed if elapsed else total:.0f} rows/sec)'
+    )
+
+
+def bulk_write_file(database, source_dir, filename, prefix, batch_size):
+    """Bulk load one csv file in a worker process."""
+    try:
+        bulk_write_to_db(
+            connections[database], source_dir, filename, prefix, batch_size
+        )
+    finally:
+        connections.close_all()
+
+
+def get_load_order(prefixes):
+    """Split prefixes into levels loadable one after another.
+
+    Tables of one level reference only tables of the previous levels,
+    so they can be loaded in parallel.
+    """
+    tables = {FILES_DICT[prefix]: prefix for prefix in prefixes}
+    dependencies = {}
+    for db_table, prefix in tables.items():
+        dependencies[prefix] = {
+            tables[field.related_model._meta.db_table]
+            for field in get_table_model(db_table)._meta.concrete_fields
+            if field.many_to_one
+            and field.related_model._meta.db_table in tables
+            and field.related_model._meta.db_table != db_table
+        }
+    levels = []
+    while dependencies:
+        level = sorted(
+            prefix for prefix, depends in dependencies.items()
+            if not depends
+        )
+        if not level:
+            raise CommandError(
+                f"Circular foreign keys between {sorted(dependencies)}"
+            )
+        levels.append(level)
+        for prefix in level:
+            del dependencies[prefix]
+        for depends in dependencies.values():
+            depends.difference_update(level)
+    return levels
+
+
+def bulk_write_files(connection, filenames, options):
+    """Bulk load csv files level by level, each level in parallel."""
+    prefixes = {filename.split('.')[0]: filename for filename in filenames}
+    # SQLite takes one writer at a time, so its files load one by one.
+    workers = 1 if connection.vendor == 'sqlite' else options["workers"]
+    for level in get_load_order(prefixes):
+        if workers < 2 or len(level) < 2:
+            for prefix in level:
+                bulk_write_to_db(
+                    connection, options["source_dir"], prefixes[prefix],
+                    prefix, options["batch_size"]
+                )
+            continue
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(level)), initializer=django.setup
+        ) as executor:
+            futures = [
+                executor.submit(
+                    bulk_write_file, connection.alias, options["source_dir"],
+                    prefixes[prefix], prefix, options["batch_size"]
+                )
+                for prefix in level
+            ]
+            for future in futures:
+                future.result()
+
+
+def finish_load(connection, prefixes):
+    """Reset id sequences and stored counters after raw inserts."""
+    models = [get_table_model(FILES_DICT[prefix]) for prefix in prefixes]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cur:
+        for sql in statements:
+            cur.execute(sql)
+    if "review" in prefixes:
+        call_command('rebuild_ratings', database=connection.alias)
+    else:
+        catalog_reloaded.send(sender=Command)
+
+
+def csv_writer(target, columns):
+    """Return function writing row batches as csv."""
+    writer = csv.writer(target)
+    writer.writerow(columns)
+
+    def write_rows(rows):
+        writer.writerows(
+            [int(value) if isinstance(value, bool) else value
+             for value in row]
+            for row in rows
+        )
+    return write_rows
+
+
+def ndjson_writer(target, columns):
+    """Return function writing row batches as json lines."""
+    def write_rows(rows):
+        target.writelines(
+            json.dumps(
+                dict(zip(columns, row)), ensure_ascii=False, default=str
+            ) + '\n'
+            for row in rows
+        )
+    return write_rows
+
+
+EXPORT_WRITERS = {
+    "csv": csv_writer,
+    "ndjson": ndjson_writer,
+}
+
+
+def export_table(connection, prefix, options):
+    """Stream db table to csv or ndjson file with a server-side cursor."""
+    db_table = FILES_DICT[prefix]
+    file_format = options["format"]
+    filename = f'{prefix}.{file_format}{".gz" if options["gzip"] else ""}'
+    path = os.path.join(options["export"], filename)
+    started = time.monotonic()
+    total = 0
+    with transaction.atomic(using=connection.alias), \
+            connection.chunked_cursor() as cur, \
+            open_file(path, 'w') as target:
+        # Model columns only: the search vector is generated by the db.
+        columns = ", ".join(
+            field.column
+            for field in get_table_model(db_table)._meta.concrete_fields
+        )
+        cur.execute(f"SELECT {columns} FROM {db_table} ORDER BY 1")
+        rows = cur.fetchmany(options["batch_size"])
+        write_rows = EXPORT_WRITERS[file_format](
+            target, [column[0] for column in cur.description]
+        )
+        while rows:
+            write_rows(rows)
+            total += len(rows)
+            rows = cur.fetchmany(options["batch_size"])
+    elapsed = time.monotonic() - started
+    logging.info(
+        f'Successfully export {total} rows from table {db_table} to {path} '
+        f'in {elapsed:.2f}s '
+        f'({total / elapsed if elapsed else total:.0f} rows/sec)'
+    )
+
+
+def delete_table(connection, prefix):
     """Function for delete data in table from csv."""
     db_table = FILES_DICT[prefix]
-    con = sqlite3.connect(f"{BASE_DIR}/db.sqlite3")
-    cur = con.cursor()
-    cur.execute(f"DELETE FROM {db_table}")
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {db_table}")
     logging.info(f"Data was deleted from {db_table}")
-    con.commit()
 
 
 def db_action(filename, options, prefix):
     """Run one of function read, write or delete."""
+    connection = connections[options["database"]]
+    if options["write"] and options["bulk"]:
+        bulk_write_to_db(
+            connection, options["source_dir"], filename, prefix,
+            options["batch_size"]
+        )
+    elif options["write"]:
+        write_to_db(connection, options["source_dir"], filename, prefix)
     if options["write"]:
-        write_to_db(filename, prefix)
+        finish_load(connection, [prefix])
     if options["read"]:
-        for data in read_db(prefix):
+        for data in read_db(connection, prefix):
             print(data)
+    if options["export"]:
+        export_table(connection, prefix, options)
+    if options["delete"]:
+        delete_table(connection, prefix)
+
+
+def files_action(filenames, options):
+    """Run read, write or delete for several files in foreign key order."""
+    connection = connections[options["database"]]
+    prefixes = [filename.split('.')[0] for filename in filenames]
+    levels = get_load_order(prefixes)
+    if options["write"]:
+        bulk_write_files(connection, filenames, options)
+        finish_load(connection, prefixes)
+    if options["read"]:
+        for level in levels:
+            for prefix in level:
+                for data in read_db(connection, prefix):
+                    print(data)
+    if options["export"]:
+        for prefix in prefixes:
+            export_table(connection, prefix, options)
     if options["delete"]:
-        delete_table(prefix)
+        for level in reversed(levels):
+            for prefix in level:
+                delete_table(connection, prefix)
 
 
 class Command(BaseCommand):
     help = 'Read from db, or write to db from csv file'
 
     def add_arguments(self, parser):
-        parser.add_argument('filename', nargs='+', type=str)
+        parser.add_argument('filename', nargs='*', type=str)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='use every known table, or every file of it to write',
+        )
+        parser.add_argument(
+            '--source-dir',
+            help=f'directory with files to write, default {CSV_FILES_DIR}',
+        )
+        parser.add_argument(
+            '--export',
+            metavar='DIR',
+            help='stream db tables to files in DIR',
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default="csv",
+            help='file format for --export',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='gzip-compress files of --export',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='processes loading independent files at once',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias from DATABASES setting',
+        )
         parser.add_argument(
             '--read',
             action='store_true',
@@ -101,6 +463,17 @@ class Command(BaseCommand):
             action='store_true',
             help='write to database',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='write to database in batches inside one transaction',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='rows per batch for --bulk',
+        )
         parser.add_argument(
             '--delete',
             action='store_true',
@@ -109,27 +482,44 @@ class Command(BaseCommand):
 
     def handle(self, **options):
         if not (options.get("read") or options.get("write")
-                or options.get("delete")):
-            raise CommandError("Use --read, --write or --delete argument")
-        filename = options.get("filename")[0]
-        prefix = filename.split('.')[0]
+                or options.get("delete") or options.get("export")):
+            raise CommandError(
+                "Use --read, --write, --export or --delete argument"
+            )
+        options["source_dir"] = options.get("source_dir") or CSV_FILES_DIR
+        filenames = options.get("filename")
+        if options.get("all") and options.get("write"):
+            filenames = sorted(
+                name for name in os.listdir(options["source_dir"])
+                if name.split('.')[0] in FILES_DICT
+            )
+        elif options.get("all"):
+            filenames = list(FILES_DICT)
+        if options.get("export"):
+            os.makedirs(options["export"], exist_ok=True)
+        if not filenames:
+            raise CommandError("Give csv filenames or use --all argument")
+        filename = filenames[0]
 
         try:
-            db_action(filename, options, prefix)
+            if len(filenames) > 1:
+                files_action(filenames, options)
+            else:
+                db_action(filename, options, filename.split('.')[0])
         except FileNotFoundError as error:
             logging.error(error)
             raise CommandError(
-                f"There is no {filename} in {CSV_FILES_DIR}"
+                f"There is no {filename} in {options['source_dir']}"
             )
-        except sqlite3.IntegrityError as error:
+        except IntegrityError as error:
             logging.error(
-                f"{CSV_FILES_DIR} {error}"
+                f"{options['source_dir']} {error}"
             )
-        except sqlite3.OperationalError as error:
+        except DatabaseError as error:
             logging.error(
                 f"{error}"
             )
-        except KeyError as error:
+        except (KeyError, FieldDoesNotExist) as error:
             logging.error(
                 f"Bad args or file not found in {error}"
             )
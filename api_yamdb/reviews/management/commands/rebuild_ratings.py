@@ -0,0 +1,170 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from reviews.models import (HISTOGRAM_FIELDS, SCORE_FIELDS, SCORES, Category,
+                            Genre, Review, ScoreStats, Title)
+from reviews.signals import catalog_reloaded
+
+COUNTER_FIELDS = SCORE_FIELDS + ('version', 'modified')
+
+
+class ScopeTotals:
+    """Title and score counts of ScoreStats scopes, added up by chunk."""
+
+    def __init__(self, scopes):
+        self.titles = dict.fromkeys(scopes, 0)
+        self.histograms = {scope: [0] * len(SCORES) for scope in scopes}
+
+    def add(self, scope, histogram):
+        if scope not in self.titles:
+            self.titles[scope] = 0
+            self.histograms[scope] = [0] * len(SCORES)
+        self.titles[scope] += 1
+        totals = self.histograms[scope]
+        for number, count in enumerate(histogram):
+            totals[number] += count
+
+    def get_stats(self, now=None):
+        now = now or timezone.now()
+        return [
+            ScoreStats(
+                scope=scope,
+                titles_count=titles,
+                reviews_count=sum(self.histograms[scope]),
+                score_sum=sum(
+                    score * count
+                    for score, count in zip(SCORES, self.histograms[scope])
+                ),
+                histogram=self.histograms[scope],
+                updated=now,
+            )
+            for scope, titles in self.titles.items()
+        ]
+
+
+def get_prior(using=DEFAULT_DB_ALIAS):
+    """Catalog mean score as the prior of Bayesian ratings."""
+    totals = Review.objects.using(using).aggregate(
+        total=Sum('score'), count=Count('id')
+    )
+    if totals['count']:
+        ScoreStats.set_prior(totals['total'] / totals['count'])
+    return ScoreStats.get_prior()
+
+
+def rebuild_chunk(title_ids, using=DEFAULT_DB_ALIAS, prior=None,
+                  totals=None):
+    """Recount stored score counters for one chunk of titles.
+
+    Scores of the chunk are read as at most ten (title, score, count)
+    rows per title. With totals, a ScopeTotals, the chunk is also added
+    to the catalog, category and genre stats.
+    """
+    prior = prior or ScoreStats.get_prior()
+    with transaction.atomic(using=using):
+        titles = list(
+            Title.objects.using(using).select_for_update().filter(
+                pk__in=title_ids
+            )
+        )
+        histograms = defaultdict(lambda: [0] * len(SCORES))
+        for title_id, score, count in Review.objects.using(using).filter(
+            title_id__in=title_ids
+        ).order_by().values_list('title_id', 'score').annotate(
+            count=Count('id')
+        ):
+            histograms[title_id][score - 1] = count
+        changed = []
+        for title in titles:
+            counters = [getattr(title, field) for field in SCORE_FIELDS]
+            histogram = histograms[title.pk]
+            for field, count in zip(HISTOGRAM_FIELDS, histogram):
+                setattr(title, field, count)
+            title.score_count = sum(histogram)
+            title.score_sum = sum(
+                score * count for score, count in zip(SCORES, histogram)
+            )
+            title.rating = Title.calculate_rating(
+                title.score_sum, title.score_count
+            )
+            title.mean_rating = Title.calculate_mean_rating(
+                title.score_sum, title.score_count
+            )
+            title.bayesian_rating = Title.calculate_bayesian_rating(
+                title.score_sum, title.score_count, prior
+            )
+            if counters != [getattr(title, field) for field in SCORE_FIELDS]:
+                title.version += 1
+                title.modified = timezone.now()
+                changed.append(title)
+        Title.objects.using(using).bulk_update(changed, COUNTER_FIELDS)
+    if totals is not None:
+        genres = defaultdict(list)
+        for title_id, genre_id in Title.genre.through.objects.using(
+            using
+        ).filter(title_id__in=title_ids).values_list('title_id', 'genre_id'):
+            genres[title_id].append(genre_id)
+        for title in titles:
+            histogram = histograms[title.pk]
+            totals.add(ScoreStats.ALL, histogram)
+            if title.category_id is not None:
+                totals.add(
+                    ScoreStats.category_scope(title.category_id), histogram
+                )
+            for genre_id in genres[title.pk]:
+                totals.add(ScoreStats.genre_scope(genre_id), histogram)
+    return len(titles)
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild stored title score counters from reviews and the score '
+        'stats of the catalog, categories and genres'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias from DATABASES setting',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='number of titles recounted in one transaction',
+        )
+
+    def handle(self, **options):
+        chunk_size = options['chunk_size']
+        using = options['database']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive')
+        prior = get_prior(using)
+        totals = ScopeTotals(
+            [ScoreStats.ALL]
+            + [ScoreStats.category_scope(pk) for pk in
+               Category.objects.using(using).values_list('pk', flat=True)]
+            + [ScoreStats.genre_scope(pk) for pk in
+               Genre.objects.using(using).values_list('pk', flat=True)]
+        )
+        last_id = 0
+        rebuilt = 0
+        while True:
+            title_ids = list(
+                Title.objects.using(using).filter(
+                    pk__gt=last_id
+                ).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not title_ids:
+                break
+            rebuilt += rebuild_chunk(title_ids, using, prior, totals)
+            last_id = title_ids[-1]
+            self.stdout.write(f'Rebuilt score counters for {rebuilt} titles')
+        with transaction.atomic(using=using):
+            ScoreStats.objects.using(using).all().delete()
+            ScoreStats.objects.using(using).bulk_create(totals.get_stats())
+        catalog_reloaded.send(sender=Title)
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import refresh
+
+
+class Command(BaseCommand):
+    help = 'Rebuild top rated and trending leaderboards of titles'
+
+    def handle(self, **options):
+        started = time.monotonic()
+        rows = refresh()
+        self.stdout.write(
+            f'Wrote {rows} leaderboard rows in '
+            f'{time.monotonic() - started:.2f}s'
+        )
@@ -0,0 +1,120 @@
+# Generated by Django 3.2 on 2026-10-18 19:45
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.utils.timezone
+from reviews import search
+
+
+def fill_score_histograms(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = Review.objects.aggregate(total=Sum('score'), count=Count('id'))
+    if not totals['count']:
+        return
+    mean = totals['total'] / totals['count']
+    weight = settings.BAYESIAN_PRIOR_WEIGHT
+    histograms = defaultdict(dict)
+    rows = Review.objects.order_by().values_list('title_id', 'score').annotate(
+        count=Count('id')
+    )
+    for title_id, score, count in rows.iterator():
+        histograms[title_id][score] = count
+    for title_id, histogram in histograms.items():
+        score_sum = sum(score * count for score, count in histogram.items())
+        score_count = sum(histogram.values())
+        Title.objects.filter(pk=title_id).update(
+            bayesian_rating=(weight * mean + score_sum)
+            / (weight + score_count),
+            **{f'score_{score}': count for score, count in histogram.items()},
+        )
+
+
+def create_search_index(apps, schema_editor):
+    # SQLite rebuilds the titles table to add columns, without triggers.
+    search.create_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32, unique=True)),
+                ('titles_count', models.PositiveIntegerField(default=0)),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('histogram', models.JSONField(default=list)),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ('scope',),
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='bayesian_rating',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_10',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(create_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_score_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+RATING_INDEX = (
+    'CREATE INDEX title_rating_idx ON reviews_title '
+    '(rating DESC{nulls}, score_count DESC, id)'
+)
+
+
+def set_rating_index_nulls(nulls):
+    """Recreate title_rating_idx on PostgreSQL with NULLS ordering.
+
+    PostgreSQL sorts NULL first in descending order, titles are ordered
+    by rating with unrated ones last. SQLite already does so and does
+    not take NULLS LAST in indexes.
+    """
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute('DROP INDEX IF EXISTS title_rating_idx')
+        schema_editor.execute(RATING_INDEX.format(nulls=nulls))
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_score_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['score_count', 'id'], name='title_score_count_idx'),
+        ),
+        migrations.RunPython(
+            set_rating_index_nulls(' NULLS LAST'), set_rating_index_nulls('')
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-18 20:34
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from reviews import search
+
+INDEXES = {
+    'title_rating_idx': (
+        'CREATE INDEX title_rating_idx ON reviews_title '
+        '(rating DESC NULLS LAST, score_count DESC, id)'
+    ),
+    'title_mean_rating_idx': (
+        'CREATE INDEX title_mean_rating_idx ON reviews_title '
+        '(mean_rating DESC NULLS LAST, score_count DESC, id)'
+    ),
+}
+
+
+def set_index_nulls_last(name):
+    """Recreate an index on PostgreSQL with unrated titles last.
+
+    See 0009_title_ordering, SQLite already sorts them so.
+    """
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+        schema_editor.execute(INDEXES[name])
+    return operation
+
+
+def fill_mean_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(score_count__gt=0).update(
+        mean_rating=Cast(F('score_sum'), FloatField())
+        / Cast(F('score_count'), FloatField())
+    )
+
+
+def create_search_index(apps, schema_editor):
+    # SQLite rebuilds the titles table to add columns, without triggers.
+    search.create_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ordering'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_index),
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            set_index_nulls_last('title_rating_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_rating_idx',
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='mean_rating',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-mean_rating', '-score_count', 'id'], name='title_mean_rating_idx'),
+        ),
+        migrations.RunPython(
+            set_index_nulls_last('title_mean_rating_idx'),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(create_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_mean_ratings, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,22 @@
+from django.conf import settings
+from django.core.cache import caches
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 from users.models import User
 
+SCORES = range(1, 11)
+HISTOGRAM_FIELDS = tuple(f'score_{score}' for score in SCORES)
+# Title columns moved by review writes, see Title.shift_score.
+SCORE_FIELDS = (
+    'score_sum', 'score_count', 'rating', 'mean_rating', 'bayesian_rating',
+    *HISTOGRAM_FIELDS,
+)
+PRIOR_CACHE_KEY = 'score-prior'
+
 
 class Category(models.Model):
     """Category model for Title."""
@@ -39,12 +54,171 @@ class Title(models.Model):
     genre = models.ManyToManyField(
         Genre, related_name='titles', blank=True
     )
+    score_sum = models.PositiveIntegerField(default=0, editable=False)
+    score_count = models.PositiveIntegerField(default=0, editable=False)
+    rating = models.PositiveSmallIntegerField(
+        blank=True, null=True, editable=False
+    )
+    # Exact mean score, rating is its integer part. Titles rank by it.
+    mean_rating = models.FloatField(blank=True, null=True, editable=False)
+    bayesian_rating = models.FloatField(
+        blank=True, null=True, editable=False
+    )
+    # Reviews by score, see histogram.
+    score_1 = models.PositiveIntegerField(default=0, editable=False)
+    score_2 = models.PositiveIntegerField(default=0, editable=False)
+    score_3 = models.PositiveIntegerField(default=0, editable=False)
+    score_4 = models.PositiveIntegerField(default=0, editable=False)
+    score_5 = models.PositiveIntegerField(default=0, editable=False)
+    score_6 = models.PositiveIntegerField(default=0, editable=False)
+    score_7 = models.PositiveIntegerField(default=0, editable=False)
+    score_8 = models.PositiveIntegerField(default=0, editable=False)
+    score_9 = models.PositiveIntegerField(default=0, editable=False)
+    score_10 = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+    modified = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.modified = timezone.now()
+        if self._state.adding:
+            self.version += 1
+            super().save(*args, **kwargs)
+            return
+        # The loaded stamp and counters may be stale by now: the stamp
+        # moves in the UPDATE as in touch, review writes own counters.
+        self.version = F('version') + 1
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in SCORE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=('version',))
+
     class Meta:
         ordering = ('-id',)
+        indexes = [
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(
+                fields=('category', 'id'), name='title_category_idx'
+            ),
+            models.Index(
+                fields=('-mean_rating', '-score_count', 'id'),
+                name='title_mean_rating_idx',
+            ),
+            models.Index(
+                fields=('score_count', 'id'), name='title_score_count_idx'
+            ),
+        ]
+
+    @property
+    def histogram(self):
+        """Review counts of scores 1-10."""
+        return [getattr(self, field) for field in HISTOGRAM_FIELDS]
+
+    @staticmethod
+    def calculate_rating(score_sum, score_count):
+        """Integer rating as the API has always rendered Avg(score)."""
+        if not score_count:
+            return None
+        return score_sum // score_count
+
+    @staticmethod
+    def calculate_mean_rating(score_sum, score_count):
+        if not score_count:
+            return None
+        return score_sum / score_count
+
+    @staticmethod
+    def calculate_bayesian_rating(score_sum, score_count, prior):
+        """Mean score pulled towards the catalog mean, see get_prior."""
+        if not score_count:
+            return None
+        weight, mean = prior
+        return (weight * mean + score_sum) / (weight + score_count)
+
+    @classmethod
+    def touch(cls, **filters):
+        """Mark titles, their reviews and comments as changed."""
+        cls.objects.filter(**filters).update(
+            version=F('version') + 1, modified=timezone.now()
+        )
+
+    @staticmethod
+    def get_rating_updates(new_sum, new_count, emptied):
+        """Ratings of UPDATEs that set score_sum and score_count."""
+        weight, mean = ScoreStats.get_prior()
+        return {
+            'rating': Case(emptied, default=new_sum / new_count),
+            'mean_rating': Case(emptied, default=ExpressionWrapper(
+                Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+                output_field=FloatField(),
+            )),
+            'bayesian_rating': Case(emptied, default=ExpressionWrapper(
+                (Value(weight * mean) + Cast(new_sum, FloatField()))
+                / (Value(float(weight)) + Cast(new_count, FloatField())),
+                output_field=FloatField(),
+            )),
+        }
+
+    @classmethod
+    def shift_score(cls, title_id, added=None, removed=None):
+        """Apply a review score change to stored counters in one UPDATE.
+
+        added is the score of a new or edited review, removed the score
+        of a deleted review or the previous one of an edited review.
+        """
+        count_delta = (added is not None) - (removed is not None)
+        new_sum = F('score_sum') + Value((added or 0) - (removed or 0))
+        new_count = F('score_count') + Value(count_delta)
+        histogram = {}
+        if added != removed:
+            if added is not None:
+                histogram[f'score_{added}'] = F(f'score_{added}') + 1
+            if removed is not None:
+                histogram[f'score_{removed}'] = F(f'score_{removed}') - 1
+        emptied = When(score_count__lte=-count_delta, then=None)
+        cls.objects.filter(pk=title_id).update(
+            version=F('version') + 1,
+            modified=timezone.now(),
+            score_sum=new_sum,
+            score_count=new_count,
+            **cls.get_rating_updates(new_sum, new_count, emptied),
+            **histogram,
+        )
+
+    @classmethod
+    def remove_scores(cls, reviews):
+        """Take reviews out of their title counters in one UPDATE.
+
+        Every title is recounted from subqueries grouped by title, so
+        deleting a user costs one statement however many titles the
+        user reviewed.
+        """
+        def subtotal(aggregate, **filters):
+            return Coalesce(Subquery(
+                reviews.filter(title=OuterRef('pk'), **filters).order_by()
+                .values('title').annotate(total=aggregate).values('total')
+            ), 0)
+
+        new_sum = F('score_sum') - subtotal(Sum('score'))
+        new_count = F('score_count') - subtotal(Count('id'))
+        emptied = When(score_count__lte=subtotal(Count('id')), then=None)
+        cls.objects.filter(pk__in=reviews.values('title_id')).update(
+            version=F('version') + 1,
+            modified=timezone.now(),
+            score_sum=new_sum,
+            score_count=new_count,
+            **cls.get_rating_updates(new_sum, new_count, emptied),
+            **{
+                f'score_{score}': F(f'score_{score}')
+                - subtotal(Count('id'), score=score)
+                for score in SCORES
+            },
+        )
 
 
 class Review(models.Model):
@@ -71,8 +245,16 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ('-id',)
+        indexes = [
+            models.Index(fields=('title', '-id'), name='review_title_idx'),
+            models.Index(fields=('pub_date',), name='review_pub_date_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author',),
@@ -98,3 +280,89 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-id',)
+        indexes = [
+            models.Index(fields=('review', '-id'), name='comment_review_idx'),
+        ]
+
+
+class LeaderboardEntry(models.Model):
+    """Title at a position of a precomputed leaderboard.
+
+    Boards are rewritten by reviews.leaderboards.refresh, see its keys.
+    """
+    board = models.CharField(max_length=32)
+    position = models.PositiveIntegerField()
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+'
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('board', 'position')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('board', 'position'), name='unique_board_position'
+            )
+        ]
+
+
+class ScoreStats(models.Model):
+    """Score distribution of the catalog, a category or a genre.
+
+    Rows are rewritten by the rebuild_ratings command only, so review
+    writes never contend for them. Scopes:
+        all            every title
+        category:<id>  titles of a category
+        genre:<id>     titles of a genre
+    """
+    ALL = 'all'
+
+    scope = models.CharField(max_length=32, unique=True)
+    titles_count = models.PositiveIntegerField(default=0)
+    reviews_count = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveBigIntegerField(default=0)
+    histogram = models.JSONField(default=list)
+    updated = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ('scope',)
+
+    def __str__(self):
+        return self.scope
+
+    @property
+    def mean(self):
+        if not self.reviews_count:
+            return None
+        return self.score_sum / self.reviews_count
+
+    @staticmethod
+    def category_scope(category_id):
+        return f'category:{category_id}'
+
+    @staticmethod
+    def genre_scope(genre_id):
+        return f'genre:{genre_id}'
+
+    @classmethod
+    def get_prior(cls):
+        """(weight, mean) of the Bayesian rating of titles.
+
+        A title rating starts as BAYESIAN_PRIOR_WEIGHT reviews with the
+        mean score of the catalog, taken from the last rebuild or
+        BAYESIAN_PRIOR_MEAN before the first one.
+        """
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        mean = cache.get(PRIOR_CACHE_KEY)
+        if mean is None:
+            stats = cls.objects.filter(scope=cls.ALL).first()
+            mean = stats and stats.mean or settings.BAYESIAN_PRIOR_MEAN
+            cache.set(PRIOR_CACHE_KEY, mean, settings.RESPONSE_CACHE_TIMEOUT)
+        return settings.BAYESIAN_PRIOR_WEIGHT, mean
+
+    @classmethod
+    def set_prior(cls, mean):
+        caches[settings.RESPONSE_CACHE_ALIAS].set(
+            PRIOR_CACHE_KEY, mean or settings.BAYESIAN_PRIOR_MEAN,
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
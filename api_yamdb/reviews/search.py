@@ -0,0 +1,194 @@
+"""Full-text search over title name and description.
+
+The index is kept in sync by the database itself, so bulk writes and
+csv loads are indexed as well. PostgreSQL stores a generated tsvector
+column with a GIN index, SQLite an external content FTS5 table updated
+by triggers. Other backends fall back to a scan with icontains.
+"""
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+
+INDEX_STATEMENTS = {
+    'postgresql': (
+        f"""
+        ALTER TABLE reviews_title
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')
+            || setweight(
+                to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B'
+            )
+        ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS title_search_idx ON reviews_title '
+        'USING gin (search_vector)',
+    ),
+    'sqlite': (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5(
+            name, description, content='reviews_title', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert
+        AFTER INSERT ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete
+        AFTER DELETE ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (
+                reviews_title_fts, rowid, name, description
+            ) VALUES ('delete', old.id, old.name, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update
+        AFTER UPDATE OF name, description ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (
+                reviews_title_fts, rowid, name, description
+            ) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO reviews_title_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+        "INSERT INTO reviews_title_fts (reviews_title_fts) VALUES ('rebuild')",
+    ),
+}
+
+DROP_STATEMENTS = {
+    'postgresql': (
+        'DROP INDEX IF EXISTS title_search_idx',
+        'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+    ),
+    'sqlite': (
+        'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+        'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+        'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+        'DROP TABLE IF EXISTS reviews_title_fts',
+    ),
+}
+
+# Query for the names of objects in the database and the names the
+# index is made of.
+INDEX_OBJECTS = {
+    'postgresql': (
+        "SELECT indexname FROM pg_indexes WHERE tablename = 'reviews_title' "
+        'AND schemaname = current_schema() '
+        'UNION SELECT column_name FROM information_schema.columns '
+        "WHERE table_name = 'reviews_title' "
+        'AND table_schema = current_schema()',
+        ('search_vector', 'title_search_idx'),
+    ),
+    'sqlite': (
+        'SELECT name FROM sqlite_master',
+        (
+            'reviews_title_fts', 'reviews_title_fts_insert',
+            'reviews_title_fts_delete', 'reviews_title_fts_update',
+        ),
+    ),
+}
+
+INDEX_MIGRATION = ('reviews', '0006_title_search')
+
+
+def create_index(schema_editor):
+    """Create the index, safe to run again.
+
+    SQLite migrations that rebuild reviews_title drop its triggers, they
+    have to call this again.
+    """
+    for statement in INDEX_STATEMENTS.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def drop_index(schema_editor):
+    for statement in DROP_STATEMENTS.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def get_missing_index(connection):
+    """Names of the index objects missing from the database."""
+    if connection.vendor not in INDEX_OBJECTS:
+        return []
+    query, names = INDEX_OBJECTS[connection.vendor]
+    with connection.cursor() as cursor:
+        cursor.execute(query)
+        present = {row[0] for row in cursor.fetchall()}
+    return [name for name in names if name not in present]
+
+
+def check_index(using, **kwargs):
+    """Fail migrate if a migration has dropped part of the index.
+
+    Without its triggers SQLite keeps serving stale search results
+    instead of raising, so this is checked after every migrate.
+    """
+    connection = connections[using]
+    recorder = MigrationRecorder(connection)
+    if INDEX_MIGRATION not in recorder.applied_migrations():
+        return
+    missing = get_missing_index(connection)
+    if missing:
+        raise CommandError(
+            f'Title search index is missing {", ".join(missing)}: '
+            'a migration that rebuilds reviews_title has to call '
+            'reviews.search.create_index() after it.'
+        )
+
+
+def get_fts5_query(query):
+    """Quote every word, FTS5 syntax is not for user input.
+
+    Words must all match, the last one as a prefix to serve search as
+    you type.
+    """
+    words = [word.replace('"', '""') for word in query.split()]
+    terms = [f'"{word}"' for word in words]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_titles(queryset, query):
+    """Filter titles matching query, best matches first."""
+    vendor = connections[queryset.db].vendor
+    if not query.split():
+        return queryset.none()
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(RawSQL(
+            f'reviews_title.search_vector @@ {tsquery}', (query,),
+            output_field=BooleanField(),
+        )).annotate(search_rank=RawSQL(
+            f'ts_rank(reviews_title.search_vector, {tsquery})', (query,),
+            output_field=FloatField(),
+        )).order_by('-search_rank', 'id')
+    if vendor == 'sqlite':
+        match = get_fts5_query(query)
+        return queryset.filter(RawSQL(
+            'reviews_title.id IN (SELECT rowid FROM reviews_title_fts '
+            'WHERE reviews_title_fts MATCH %s)', (match,),
+            output_field=BooleanField(),
+        )).annotate(search_rank=RawSQL(
+            'SELECT -bm25(reviews_title_fts, 10.0, 1.0) '
+            'FROM reviews_title_fts WHERE reviews_title_fts MATCH %s '
+            'AND reviews_title_fts.rowid = reviews_title.id', (match,),
+            output_field=FloatField(),
+        )).order_by('-search_rank', 'id')
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    ).order_by('id')
@@ -0,0 +1,134 @@
+import threading
+from collections import defaultdict
+
+from django.db.models import Q
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+from users.models import User
+
+from .models import Category, Comment, Genre, Review, Title
+
+# Sent after titles, reviews or counters were changed by raw SQL.
+catalog_reloaded = Signal()
+
+_state = threading.local()
+
+
+def get_deleting(model):
+    """Pks of model rows being deleted in this thread.
+
+    A delete cascade sends pre_delete for every row before deleting
+    any, so children of a deleted review, title or user skip stamp and
+    counter updates that the parent delete makes useless.
+    """
+    if not hasattr(_state, 'deleting'):
+        _state.deleting = defaultdict(set)
+    return _state.deleting[model]
+
+
+@receiver(pre_delete, sender=Review)
+@receiver(pre_delete, sender=Title)
+def remember_deleting(sender, instance, **kwargs):
+    get_deleting(sender).add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=User)
+def forget_deleted(sender, instance, **kwargs):
+    get_deleting(sender).discard(instance.pk)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    """Keep the stored title and score of an edited review.
+
+    The row stays locked until Review.save commits, so concurrent edits
+    of a review shift the counters one after another.
+    """
+    instance._previous_score = None
+    if instance.pk is not None:
+        instance._previous_score = Review.objects.select_for_update().filter(
+            pk=instance.pk
+        ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_title_score_on_save(sender, instance, **kwargs):
+    """Add a new review to its title counters or move an edited one."""
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        Title.shift_score(instance.title_id, added=instance.score)
+        return
+    title_id, score = previous
+    if title_id == instance.title_id:
+        Title.shift_score(title_id, added=instance.score, removed=score)
+        return
+    Title.shift_score(title_id, removed=score)
+    Title.shift_score(instance.title_id, added=instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_score_on_delete(sender, instance, **kwargs):
+    """Remove a deleted review from its title counters."""
+    get_deleting(Review).discard(instance.pk)
+    if instance.title_id not in get_deleting(Title) and (
+        instance.author_id not in get_deleting(User)
+    ):
+        Title.shift_score(instance.title_id, removed=instance.score)
+
+
+@receiver(pre_delete, sender=User)
+def remove_scores_of_deleted_user(sender, instance, **kwargs):
+    """Recount the titles a deleted user reviewed before the cascade."""
+    get_deleting(User).add(instance.pk)
+    Title.remove_scores(Review.objects.filter(author=instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_title_on_comment_write(sender, instance, **kwargs):
+    # Deleting the review moves the title stamp once for its comments.
+    if instance.review_id not in get_deleting(Review):
+        Title.touch(reviews=instance.review_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_titles_on_category_write(sender, instance, **kwargs):
+    Title.touch(category=instance.pk)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_genre_write(sender, instance, **kwargs):
+    Title.touch(genre=instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genre_change(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        Title.touch(pk__in=pk_set or ())
+    else:
+        Title.touch(pk=instance.pk)
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_username(sender, instance, **kwargs):
+    # Without a query: a deferred username is not remembered.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def touch_titles_on_username_change(sender, instance, created, **kwargs):
+    """Reviews and comments render author usernames, see ETags."""
+    loaded = getattr(instance, '_loaded_username', None)
+    if created or loaded is None or loaded == instance.username:
+        return
+    Title.touch(pk__in=Review.objects.filter(
+        Q(author=instance.pk) | Q(comments__author=instance.pk)
+    ).values('title_id'))
+    instance._loaded_username = instance.username
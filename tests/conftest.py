@@ -1,9 +1,38 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
+# Database tests run against a local stand-in unless another one is given.
+settings.DATABASES = {
+    'default': {
+        'ENGINE': os.getenv(
+            'TEST_DB_ENGINE', 'django.db.backends.sqlite3'
+        ),
+        'NAME': os.getenv('TEST_DB_NAME', ':memory:'),
+        'USER': os.getenv('TEST_DB_USER', ''),
+        'PASSWORD': os.getenv('TEST_DB_PASSWORD', ''),
+        'HOST': os.getenv('TEST_DB_HOST', ''),
+        'PORT': os.getenv('TEST_DB_PORT', ''),
+    }
+}
+connections.settings = connections.configure_settings(settings.DATABASES)
+del connections['default']
+
 pytest_plugins = [
+    'tests.fixtures.budgets',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
@@ -0,0 +1,200 @@
+"""Query and wall time budgets of API routes.
+
+The measure fixture sends one request through a test client and records
+its SQL queries, repeated queries and wall time. Records of the whole
+run are written to a JSON report (--budget-report), so the numbers can
+be compared across commits.
+"""
+import io
+import json
+import os
+import re
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Statements of the test transaction, not of the code under test.
+IGNORED_SQL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+# String and number literals, replaced to compare statements.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+records = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('budgets', 'API query and wall time budgets')
+    group.addoption(
+        '--budget-report',
+        default=os.getenv('BUDGET_REPORT', 'budget_report.json'),
+        help='file to write the measured routes to, "" to skip the report',
+    )
+    group.addoption(
+        '--budget-time-factor',
+        type=float,
+        default=float(os.getenv('BUDGET_TIME_FACTOR', 1)),
+        help='multiplier of the wall time budgets, for slow machines',
+    )
+
+
+def get_commit(rootdir):
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=rootdir,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption('budget_report', default='')
+    if not path or not records:
+        return
+    report = {
+        'commit': get_commit(str(session.config.rootdir)),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'routes': sorted(
+            records, key=lambda record: (record['route'], record['method'])
+        ),
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+@pytest.fixture
+def budget_catalog(django_user_model):
+    """Catalog with several pages of every resource.
+
+    Returns ids and lookups of one object of every resource, for the
+    urls of detail routes.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'category-{number}')
+        for number in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(8)
+    )
+    django_user_model.objects.bulk_create(
+        django_user_model(
+            username=f'reader{number}', email=f'reader{number}@yamdb.fake',
+            confirmation_code=f'code{number}',
+        )
+        for number in range(20)
+    )
+    authors = list(django_user_model.objects.filter(
+        username__startswith='reader'
+    ).order_by('id'))
+    categories = list(Category.objects.order_by('id'))
+    genres = list(Genre.objects.order_by('id'))
+    scores = [number % 10 + 1 for number in range(len(authors))]
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {number}', year=1950 + number,
+            description='Описание ' * 20,
+            category=categories[number % len(categories)],
+        )
+        for number in range(60)
+    )
+    titles = list(Title.objects.order_by('id'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+        for number, title in enumerate(titles)
+        for genre in (genres[number % 8], genres[(number + 3) % 8])
+    )
+    Review.objects.bulk_create(
+        Review(title=title, author=author, text='Отзыв ' * 30, score=score)
+        for title in titles
+        for author, score in zip(authors, scores)
+    )
+    review = Review.objects.filter(title=titles[0]).order_by('id').first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий ' * 10)
+        for author in authors
+    )
+    from django.core.management import call_command
+    from reviews.leaderboards import refresh
+    call_command('rebuild_ratings', stdout=io.StringIO())
+    refresh()
+    return {
+        'title_id': titles[0].pk,
+        'review_id': review.pk,
+        'comment_id': review.comments.order_by('id').first().pk,
+        'category': categories[0].slug,
+        'genre': genres[0].slug,
+        'username': authors[0].username,
+    }
+
+
+def count_duplicates(queries):
+    """Queries that repeat an earlier statement, with any parameters.
+
+    These are the N+1 queries of loops over objects.
+    """
+    statements = Counter(LITERALS.sub('?', query) for query in queries)
+    return sum(count - 1 for count in statements.values())
+
+
+@pytest.fixture
+def measure():
+    """Send a request and record its queries and wall time.
+
+    measure(client, method, url, route=..., **kwargs) returns the
+    response and its record.
+    """
+    def send(client, method, url, route=None, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            elapsed = time.perf_counter() - started
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].startswith(IGNORED_SQL)
+        ]
+        record = {
+            'route': route or url,
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'queries': len(queries),
+            'duplicate_queries': count_duplicates(queries),
+            'milliseconds': round(elapsed * 1000, 3),
+            'sql': queries,
+        }
+        records.append(record)
+        return response, record
+    return send
+
+
+@pytest.fixture
+def assert_budget(request):
+    """Fail when a record is over its query or wall time budget."""
+    factor = request.config.getoption('budget_time_factor', default=1)
+
+    def check(record, queries, duplicates=0, milliseconds=500):
+        label = f'{record["method"]} {record["route"]}'
+        record['budget'] = {
+            'queries': queries,
+            'duplicate_queries': duplicates,
+            'milliseconds': milliseconds * factor,
+        }
+        assert record['queries'] <= queries, (
+            f'{label}: {record["queries"]} SQL-запросов при бюджете '
+            f'{queries}:\n' + '\n'.join(record['sql'])
+        )
+        assert record['duplicate_queries'] <= duplicates, (
+            f'{label}: {record["duplicate_queries"]} повторных запросов '
+            f'при бюджете {duplicates}:\n' + '\n'.join(record['sql'])
+        )
+        assert record['milliseconds'] <= milliseconds * factor, (
+            f'{label}: {record["milliseconds"]} мс при бюджете '
+            f'{milliseconds * factor} мс'
+        )
+    return check
@@ -0,0 +1,116 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser', email='user@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create(
+        username='TestModerator', email='moderator@yamdb.fake',
+        role='moderator'
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def catalog(django_user_model, category, genres):
+    """Full pages of every resource with reviews and comments by many users."""
+    from reviews.models import Comment, Review, Title
+    authors = [
+        django_user_model.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(10)
+    ]
+    titles = []
+    for number in range(10):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number,
+            category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=number + 1
+        )
+        for number, author in enumerate(authors)
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text='Комментарий'
+        )
+    return titles, reviews
+
+
+@pytest.fixture
+def rated_catalog(catalog):
+    """Titles of catalog, 1-4 rated 9, 7, 7 (two reviews) and 3.
+
+    Title 0 is rated 5 by its ten reviews, the rest have none.
+    """
+    from reviews.models import Review
+    titles, reviews = catalog
+    authors = [review.author for review in reviews]
+    for title, scores in zip(titles[1:5], ((9,), (7,), (7, 7), (3,))):
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+    return titles
@@ -0,0 +1,157 @@
+import pytest
+from django.urls import URLPattern, URLResolver, resolve
+
+# Budgets of every route of api/urls.py on the budget_catalog data:
+# method, url, client, request data, status, most SQL queries.
+BUDGETS = (
+    ('get', '/api/v1/', 'admin_client', None, 200, 0),
+    ('post', '/api/v1/auth/signup/', 'client',
+     {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}, 200, 2),
+    ('post', '/api/v1/auth/token/', 'client',
+     {'username': '{username}', 'confirmation_code': 'code0'}, 200, 1),
+    ('get', '/api/v1/cache/stats/', 'admin_client', None, 200, 0),
+    ('get', '/api/v1/mail/stats/', 'admin_client', None, 200, 0),
+    ('get', '/api/v1/leaderboards/top/', 'client', None, 200, 2),
+    ('get', '/api/v1/leaderboards/top/categories/{category}/', 'client',
+     None, 200, 3),
+    ('get', '/api/v1/leaderboards/top/genres/{genre}/', 'client', None,
+     200, 3),
+    ('get', '/api/v1/leaderboards/trending/', 'client', None, 200, 2),
+    ('get', '/api/v1/titles/', 'client', None, 200, 3),
+    ('post', '/api/v1/titles/', 'admin_client',
+     {'name': 'Новое', 'year': 2000, 'category': '{category}',
+      'genre': ['{genre}']}, 201, 9),
+    ('post', '/api/v1/titles/batch/', 'admin_client',
+     [{'name': f'Пакет {number}', 'year': 2000, 'category': '{category}',
+       'genre': ['{genre}']} for number in range(20)], 200, 7),
+    ('get', '/api/v1/titles/stats/', 'client', None, 200, 1),
+    ('get', '/api/v1/titles/{title_id}/', 'client', None, 200, 3),
+    ('get', '/api/v1/titles/{title_id}/stats/', 'client', None, 200, 1),
+    ('put', '/api/v1/titles/{title_id}/', 'admin_client',
+     {'name': 'Другое', 'year': 2001, 'category': '{category}',
+      'genre': ['{genre}']}, 200, 12),
+    ('patch', '/api/v1/titles/{title_id}/', 'admin_client',
+     {'year': 2001}, 200, 6),
+    ('delete', '/api/v1/titles/{title_id}/', 'admin_client', None, 204, 11),
+    ('get', '/api/v1/categories/', 'client', None, 200, 2),
+    ('post', '/api/v1/categories/', 'admin_client',
+     {'name': 'Новая', 'slug': 'new'}, 201, 3),
+    ('get', '/api/v1/categories/{category}/stats/', 'client', None, 200, 2),
+    ('delete', '/api/v1/categories/{category}/', 'admin_client', None,
+     204, 5),
+    ('get', '/api/v1/genres/', 'client', None, 200, 2),
+    ('post', '/api/v1/genres/', 'admin_client',
+     {'name': 'Новый', 'slug': 'new'}, 201, 3),
+    ('get', '/api/v1/genres/{genre}/stats/', 'client', None, 200, 2),
+    ('delete', '/api/v1/genres/{genre}/', 'admin_client', None, 204, 5),
+    ('get', '/api/v1/users/', 'admin_client', None, 200, 2),
+    ('post', '/api/v1/users/', 'admin_client',
+     {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}, 201, 3),
+    ('get', '/api/v1/users/me/', 'admin_client', None, 200, 1),
+    ('patch', '/api/v1/users/me/', 'admin_client', {'bio': 'Био'}, 200, 3),
+    ('get', '/api/v1/users/{username}/', 'admin_client', None, 200, 1),
+    ('patch', '/api/v1/users/{username}/', 'admin_client',
+     {'bio': 'Био'}, 200, 2),
+    ('delete', '/api/v1/users/{username}/', 'admin_client', None, 204, 11),
+    ('get', '/api/v1/titles/{title_id}/reviews/', 'client', None, 200, 3),
+    ('post', '/api/v1/titles/{title_id}/reviews/', 'admin_client',
+     {'text': 'Отзыв', 'score': 5}, 201, 4),
+    ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/', 'client',
+     None, 200, 2),
+    ('put', '/api/v1/titles/{title_id}/reviews/{review_id}/', 'admin_client',
+     {'text': 'Отзыв', 'score': 5}, 200, 4),
+    ('patch', '/api/v1/titles/{title_id}/reviews/{review_id}/',
+     'admin_client', {'score': 5}, 200, 4),
+    ('delete', '/api/v1/titles/{title_id}/reviews/{review_id}/',
+     'admin_client', None, 204, 5),
+    ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'client', None, 200, 3),
+    ('post', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+     'admin_client', {'text': 'Комментарий'}, 201, 3),
+    ('get',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'client', None, 200, 2),
+    ('put',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'admin_client', {'text': 'Комментарий'}, 200, 3),
+    ('patch',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'admin_client', {'text': 'Комментарий'}, 200, 3),
+    ('delete',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+     'admin_client', None, 204, 3),
+)
+
+# Repeated statements allowed by route. Batch writes read back ids of
+# inserted titles on backends without RETURNING.
+DUPLICATES = {
+    ('post', '/api/v1/titles/batch/'): 1,
+}
+
+
+def fill(value, lookups):
+    if isinstance(value, str):
+        return value.format(**lookups)
+    if isinstance(value, list):
+        return [fill(item, lookups) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, lookups) for key, item in value.items()}
+    return value
+
+
+def get_routes(patterns):
+    """Views and methods of the api/urls.py routes."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from get_routes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view = pattern.callback
+            actions = getattr(view, 'actions', None) or {'get': None}
+            allowed = view.cls.http_method_names
+            for method in actions:
+                if method in allowed and method != 'head':
+                    yield view, method
+
+
+@pytest.mark.django_db
+class TestBudgets:
+
+    @pytest.mark.parametrize(
+        'method, route, client_name, data, status, queries', BUDGETS
+    )
+    def test_route_budget(
+        self, method, route, client_name, data, status, queries, request,
+        budget_catalog, measure, assert_budget,
+    ):
+        client = request.getfixturevalue(client_name)
+        url = route.format(**budget_catalog)
+        kwargs = {}
+        if data is not None:
+            kwargs = {'data': fill(data, budget_catalog), 'format': 'json'}
+        response, record = measure(client, method, url, route=route,
+                                   **kwargs)
+        assert response.status_code == status, (
+            f'Проверьте, что {method.upper()} {url} возвращает код {status}'
+        )
+        assert_budget(
+            record, queries, duplicates=DUPLICATES.get((method, route), 0)
+        )
+
+    def test_every_route_has_budget(self):
+        from api import urls
+        declared = {
+            (resolve(route.format(
+                title_id=1, review_id=1, comment_id=1, category='a',
+                genre='a', username='a',
+            )).func, method)
+            for method, route, *_ in BUDGETS
+        }
+        missing = {
+            f'{method.upper()} {view.__name__}'
+            for view, method in get_routes(urls.urlpatterns)
+            if (view, method) not in declared
+        }
+        assert not missing, (
+            'Задайте бюджет запросов для маршрутов: '
+            f'{", ".join(sorted(missing))}'
+        )
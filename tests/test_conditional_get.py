@@ -0,0 +1,110 @@
+import pytest
+from reviews.models import Comment, Review, Title
+from reviews.signals import get_deleting
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def urls(self, title, review):
+        return (
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+
+    @pytest.fixture
+    def review(self, title, user):
+        return Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+
+    def test_not_modified(self, title, review, client):
+        for url in self.urls(title, review):
+            response = client.get(url)
+            etag = response['ETag']
+            cached = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert cached.status_code == 304, (
+                f'Проверьте, что {url} отвечает 304 на совпавший ETag'
+            )
+            cached = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert cached.status_code == 304, (
+                f'Проверьте, что {url} отвечает 304 на If-Modified-Since'
+            )
+
+    def test_not_modified_skips_serialization(
+        self, title, review, client, django_assert_num_queries
+    ):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    @pytest.mark.parametrize('write', (
+        lambda title, review, user: Comment.objects.create(
+            review=review, author=user, text='Комментарий'
+        ),
+        lambda title, review, user: review.save(),
+        lambda title, review, user: title.category.save(),
+        lambda title, review, user: title.genre.clear(),
+    ))
+    def test_writes_change_etag(self, title, review, user, client, write):
+        etags = [client.get(url)['ETag'] for url in self.urls(title, review)]
+        write(title, review, user)
+        for url, etag in zip(self.urls(title, review), etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что запись меняет ETag {url}'
+            )
+
+    def test_author_rename_changes_etag(
+        self, title, review, user, client, admin_client
+    ):
+        etags = [client.get(url)['ETag'] for url in self.urls(title, review)]
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'username': 'renamed'}
+        )
+        assert response.status_code == 200
+        for url, etag in zip(self.urls(title, review), etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что переименование автора меняет ETag {url}'
+            )
+
+    def test_review_delete_moves_stamp_once(
+        self, title, review, user, admin, client
+    ):
+        for author in (user, admin):
+            Comment.objects.create(
+                review=review, author=author, text='Комментарий'
+            )
+        etag = client.get(f'/api/v1/titles/{title.pk}/')['ETag']
+        version = Title.objects.get(pk=title.pk).version
+        review.delete()
+        assert Title.objects.get(pk=title.pk).version == version + 1, (
+            'Проверьте, что удаление отзыва с комментариями меняет версию '
+            'произведения один раз'
+        )
+        assert not get_deleting(Review) and not get_deleting(Title)
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+
+    def test_stale_title_save_changes_etag(
+        self, title, review, user, client
+    ):
+        loaded = Title.objects.get(pk=title.pk)
+        Comment.objects.create(review=review, author=user, text='Комментарий')
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        loaded.description = 'Новое описание'
+        loaded.save()
+        assert loaded.version == Title.objects.get(pk=title.pk).version
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что сохранение устаревшего произведения меняет ETag'
+        )
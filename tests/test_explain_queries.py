@@ -0,0 +1,26 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestExplainQueries:
+
+    def test_explain_every_endpoint(self, catalog):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        for endpoint in (
+            'titles?genre', 'titles?ordering=-rating', 'reviews', 'comments', 'users?search'
+        ):
+            assert f'\n{endpoint}\n' in f'\n{output}', (
+                f'Проверьте, что explain_queries выводит план для {endpoint}'
+            )
+        assert 'title_year_idx' in output, (
+            'Проверьте, что фильтр по году использует индекс title_year_idx'
+        )
+        assert 'title_mean_rating_idx' in output, (
+            'Проверьте, что сортировка по рейтингу использует индекс '
+            'title_mean_rating_idx'
+        )
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import orjson
+import pytest
+from api.renderers import FastJSONRenderer
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Title
+
+URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?page=2',
+    '/api/v1/titles/?genre=drama',
+    '/api/v1/titles/?search=Произведение',
+    '/api/v1/titles/?fields=id,name,rating',
+    '/api/v1/titles/?fields=genre,category',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/?cursor=',
+    '/api/v1/titles/{title_id}/reviews/?fields=author,pub_date',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?page=2',
+)
+
+
+@pytest.mark.django_db
+class TestFastList:
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_same_output_as_serializers(
+        self, url, catalog, client, settings
+    ):
+        titles, reviews = catalog
+        Title.objects.filter(pk=titles[1].pk).update(
+            category=None, description='Описание строки', rating=7
+        )
+        url = url.format(title_id=titles[0].pk, review_id=reviews[0].pk)
+        fast = client.get(url)
+        cache.clear()
+        settings.FAST_LIST_RESPONSES = False
+        slow = client.get(url)
+        assert fast.status_code == slow.status_code == 200
+        assert fast.content == slow.content, (
+            f'Проверьте, что быстрый список {url} совпадает с сериализатором'
+        )
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'Юникод\u2028и\u2029 "кавычки"',
+            'date': datetime(2023, 2, 24, 10, 12, 30, 123456,
+                             tzinfo=timezone.utc),
+            'decimal': Decimal('1.5'),
+            'nested': [{1: None, 'flag': True}],
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'Проверьте, что FastJSONRenderer выводит то же, что JSONRenderer'
+        assert FastJSONRenderer().render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+
+    def test_list_is_encoded_by_orjson(self, catalog, client, monkeypatch):
+        encoded = []
+        dumps = orjson.dumps
+
+        def spy(*args, **kwargs):
+            encoded.append(args[0])
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(orjson, 'dumps', spy)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert encoded and encoded[-1] == response.json(), (
+            'Проверьте, что списки кодируются через orjson.dumps'
+        )
@@ -0,0 +1,78 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+SIZES = {
+    'users': 30, 'categories': 3, 'genres': 5, 'titles': 40, 'reviews': 400,
+    'comments': 50,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateCatalog:
+
+    def test_generates_consistent_catalog(self, title):
+        call_command('generate_catalog', batch_size=64, **SIZES)
+        assert Title.objects.count() == SIZES['titles'] + 1
+        assert Review.objects.count() == SIZES['reviews']
+        assert Comment.objects.count() == SIZES['comments']
+        assert Genre.objects.count() == SIZES['genres'] + 2
+        assert User.objects.count() == SIZES['users']
+        counts = list(
+            Review.objects.order_by().values('title').annotate(
+                count=Count('id'), total=Sum('score')
+            ).values_list('title', 'count', 'total')
+        )
+        assert max(count for _, count, _ in counts) > SIZES['reviews'] / 40, (
+            'Проверьте, что отзывы распределены по произведениям неравномерно'
+        )
+        for title_id, count, total in counts:
+            stored = Title.objects.get(pk=title_id)
+            assert (stored.score_count, stored.score_sum) == (count, total), (
+                'Проверьте, что generate_catalog пересчитывает счётчики оценок'
+            )
+        last = Title.objects.order_by('-id').first().pk
+        new = Title.objects.create(name='Новое произведение', year=2000)
+        assert new.pk == last + 1, (
+            'Проверьте, что последовательности id сдвинуты после загрузки'
+        )
+
+    def test_same_seed_same_catalog(self):
+        call_command('generate_catalog', seed=7, **SIZES)
+        first = list(Review.objects.order_by('id').values_list(
+            'title', 'author', 'score'
+        ))
+        call_command('generate_catalog', seed=7, **SIZES)
+        second = list(Review.objects.order_by('id').values_list(
+            'title', 'author', 'score'
+        ))[len(first):]
+        offset = SIZES['titles']
+        assert [(title - offset, author - SIZES['users'], score)
+                for title, author, score in second] == first
+
+    def test_too_many_reviews(self):
+        with pytest.raises(Exception, match='--titles \\* --users'):
+            call_command(
+                'generate_catalog', users=2, titles=2, reviews=5,
+            )
+
+    # Shared in-memory SQLite locks tables of concurrent writes.
+    @pytest.mark.parametrize('concurrency, write_ratio', ((4, 0), (1, 0.25)))
+    def test_benchmark_load(self, concurrency, write_ratio):
+        call_command('generate_catalog', **SIZES)
+        out = StringIO()
+        call_command(
+            'benchmark_load', requests=40, concurrency=concurrency,
+            write_ratio=write_ratio, stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        assert lines[0].startswith('40 requests in')
+        assert lines[-1].startswith('  all: 40 requests, 0 errors'), (
+            'Проверьте, что нагрузочный тест проходит без ошибок'
+        )
+        assert 'p99' in lines[-1]
+        assert not User.objects.filter(username__startswith='loadtest-')
@@ -0,0 +1,132 @@
+import pytest
+from django.core.management import call_command
+from reviews.management.commands import import_csv
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+CSV_FILES = {
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n',
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+    ),
+    'titles.csv': 'id,name,year,category\n1,Побег из Шоушенка,1994,1\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Ставлю десять звёзд!\nОтлично",100,10,'
+        '2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,100,2020-01-13T23:20:02.422Z\n'
+    ),
+}
+LOAD_ORDER = (
+    'category.csv', 'genre.csv', 'users.csv', 'titles.csv',
+    'genre_title.csv', 'review.csv',
+)
+
+
+@pytest.fixture
+def csv_dir(tmp_path, monkeypatch):
+    for filename, content in CSV_FILES.items():
+        (tmp_path / filename).write_text(content, encoding='utf-8')
+    monkeypatch.setattr(import_csv, 'CSV_FILES_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    @pytest.mark.parametrize('bulk', (False, True))
+    def test_write_through_django_connection(self, csv_dir, bulk):
+        for filename in LOAD_ORDER:
+            call_command(
+                'import_csv', filename, write=True, bulk=bulk, batch_size=1
+            )
+        assert Category.objects.count() == 2, (
+            'Проверьте, что import_csv загружает категории'
+        )
+        user = User.objects.get(pk=100)
+        assert user.username == 'bingobongo' and user.is_active, (
+            'Проверьте, что import_csv заполняет отсутствующие в csv поля '
+            'значениями по умолчанию'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.category.slug == 'movie', (
+            'Проверьте, что import_csv сопоставляет колонку category с '
+            'внешним ключом'
+        )
+        assert list(title.genre.all()) == list(Genre.objects.all())
+        assert Review.objects.get(pk=1).text == 'Ставлю десять звёзд!\nОтлично'
+
+    def test_bulk_write_is_one_transaction(self, csv_dir):
+        (csv_dir / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n1,Книга,book\n', encoding='utf-8'
+        )
+        call_command(
+            'import_csv', 'category.csv', write=True, bulk=True, batch_size=1
+        )
+        assert not Category.objects.exists(), (
+            'Проверьте, что ошибка в пакетной загрузке откатывает всю загрузку'
+        )
+
+    def test_delete(self, csv_dir):
+        call_command('import_csv', 'category.csv', write=True, bulk=True)
+        call_command('import_csv', 'category.csv', delete=True)
+        assert not Category.objects.exists(), (
+            'Проверьте, что import_csv --delete очищает таблицу'
+        )
+
+    def test_load_order(self):
+        assert import_csv.get_load_order(import_csv.FILES_DICT) == [
+            ['category', 'genre', 'users'],
+            ['titles'],
+            ['genre_title', 'review'],
+            ['comments'],
+        ], 'Проверьте порядок загрузки таблиц по внешним ключам'
+
+    def test_write_all(self, csv_dir):
+        call_command('import_csv', all=True, write=True)
+        assert Comment.objects.get(pk=1).review.title.rating == 10, (
+            'Проверьте, что import_csv --all загружает все файлы и '
+            'пересчитывает рейтинги'
+        )
+        review = Review.objects.create(
+            title_id=1, author=User.objects.create(
+                username='new', email='new@yamdb.fake'
+            ), text='Новый', score=1
+        )
+        assert review.pk == 2, (
+            'Проверьте, что после загрузки сбрасываются счётчики id'
+        )
+        call_command('import_csv', all=True, delete=True)
+        assert not Title.objects.exists()
+
+    @pytest.mark.parametrize('file_format, compress', (
+        ('csv', False), ('ndjson', True),
+    ))
+    def test_export_round_trip(self, csv_dir, tmp_path, file_format, compress):
+        call_command('import_csv', all=True, write=True)
+        User.objects.filter(pk=100).update(is_staff=True)
+        Title.objects.create(name='Без категории', year=2000)
+        snapshot = {
+            model: list(model.objects.order_by('pk').values())
+            for model in (Category, User, Title, Review, Comment)
+        }
+        export_dir = tmp_path / 'export'
+        call_command(
+            'import_csv', all=True, export=str(export_dir),
+            format=file_format, gzip=compress, batch_size=1
+        )
+        call_command('import_csv', all=True, delete=True)
+        call_command(
+            'import_csv', all=True, write=True, source_dir=str(export_dir)
+        )
+        for model, rows in snapshot.items():
+            assert list(model.objects.order_by('pk').values()) == rows, (
+                f'Проверьте, что выгрузка {model.__name__} загружается '
+                f'обратно без изменений'
+            )
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import Category, LeaderboardEntry, Review, Title
+
+
+def get_names(response):
+    assert response.status_code == 200
+    return [entry['title']['name'] for entry in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    @pytest.fixture
+    def ranked(self, rated_catalog):
+        call_command('refresh_leaderboards', stdout=StringIO())
+        return rated_catalog
+
+    def test_top(self, ranked, client):
+        names = get_names(client.get('/api/v1/leaderboards/top/'))
+        assert names[:5] == [
+            'Произведение 1', 'Произведение 3', 'Произведение 2',
+            'Произведение 0', 'Произведение 4',
+        ], (
+            'Проверьте, что лидеры упорядочены по рейтингу и числу отзывов'
+        )
+        assert len(names) == 5, (
+            'Проверьте, что в лидеры не попадают произведения без отзывов'
+        )
+        entry = client.get('/api/v1/leaderboards/top/').json()['results'][0]
+        assert entry == {
+            'position': 1, 'score': 9.0,
+            'title': {'id': ranked[1].pk, 'name': 'Произведение 1',
+                      'year': 2001, 'rating': 9},
+        }
+
+    def test_top_ranks_by_exact_mean(self, ranked, client, admin, user):
+        Review.objects.create(
+            title=ranked[1], author=admin, text='Отзыв', score=10
+        )
+        for author in (admin, user, ranked[0].reviews.first().author):
+            Review.objects.create(
+                title=ranked[5], author=author, text='Отзыв', score=9
+            )
+        call_command('refresh_leaderboards', stdout=StringIO())
+        entries = client.get('/api/v1/leaderboards/top/').json()['results']
+        assert [
+            (entry['title']['name'], entry['score']) for entry in entries[:2]
+        ] == [('Произведение 1', 9.5), ('Произведение 5', 9.0)], (
+            'Проверьте, что лидеры с одним целым рейтингом упорядочены '
+            'по точной средней оценке'
+        )
+
+    def test_category_and_genre(self, ranked, client):
+        other = Category.objects.create(name='Книга', slug='book')
+        Title.objects.filter(pk=ranked[1].pk).update(category=other)
+        ranked[3].genre.clear()
+        call_command('refresh_leaderboards', stdout=StringIO())
+        assert get_names(client.get(
+            '/api/v1/leaderboards/top/categories/book/'
+        )) == ['Произведение 1']
+        assert 'Произведение 1' not in get_names(client.get(
+            '/api/v1/leaderboards/top/categories/movie/'
+        ))
+        assert 'Произведение 3' not in get_names(client.get(
+            '/api/v1/leaderboards/top/genres/drama/'
+        ))
+        assert client.get(
+            '/api/v1/leaderboards/top/genres/missing/'
+        ).status_code == 404
+
+    def test_trending_weights_recent_reviews(self, ranked, client):
+        now = timezone.now()
+        Review.objects.filter(title=ranked[0]).update(
+            pub_date=now - timedelta(days=30)
+        )
+        Review.objects.filter(title=ranked[3]).update(
+            pub_date=now - timedelta(days=3)
+        )
+        call_command('refresh_leaderboards', stdout=StringIO())
+        names = get_names(client.get('/api/v1/leaderboards/trending/'))
+        assert 'Произведение 0' not in names, (
+            'Проверьте, что старые отзывы не учитываются в трендах'
+        )
+        assert names[-1] == 'Произведение 3', (
+            'Проверьте, что давние отзывы весят меньше свежих'
+        )
+
+    def test_page_reads_only_the_board(
+        self, ranked, client, django_assert_num_queries
+    ):
+        with django_assert_num_queries(2):
+            client.get('/api/v1/leaderboards/top/')
+        Title.objects.filter(pk=ranked[1].pk).delete()
+        assert not LeaderboardEntry.objects.filter(title=ranked[1].pk)
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from api.metrics import BUCKETS, registry
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def scrape(client, **extra):
+    response = client.get('/metrics', **extra)
+    assert response.status_code == 200, (
+        'Проверьте, что адрес /metrics доступен'
+    )
+    return response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+
+    def test_request_metrics(self, client, catalog):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/100500/')
+        text = scrape(client)
+        labels = 'view="TitleViewSet",action="list"'
+        assert (
+            f'yamdb_http_requests_total{{{labels},method="GET",status="200"}} 1'
+            in text
+        ), 'Проверьте, что запросы считаются по view, action и статусу'
+        assert (
+            'yamdb_http_requests_total{view="TitleViewSet",action="retrieve",'
+            'method="GET",status="404"} 1' in text
+        )
+        assert f'yamdb_http_request_duration_seconds_count{{{labels}}} 1' in text
+        assert (
+            f'yamdb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1'
+            in text
+        )
+        queries = next(
+            line for line in text.splitlines()
+            if line.startswith(f'yamdb_db_queries_total{{{labels}}}')
+        )
+        assert int(queries.split()[-1]) > 0, (
+            'Проверьте, что считаются SQL-запросы запроса'
+        )
+        assert 'yamdb_response_cache_total{group="titles"' in text
+
+    def test_workers_are_summed(self, client, catalog, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        other = {
+            'requests': [['TitleViewSet', 'list', 'GET', 200, 4]],
+            'durations': [
+                ['TitleViewSet', 'list', [4] + [0] * (len(BUCKETS) - 1)
+                 + [0.01, 4]],
+            ],
+            'queries': [['TitleViewSet', 'list', [12, 0.002]]],
+        }
+        (tmp_path / '1.json').write_text(json.dumps(other))
+        client.get('/api/v1/titles/')
+        text = scrape(client)
+        labels = 'view="TitleViewSet",action="list"'
+        assert (
+            f'yamdb_http_requests_total{{{labels},method="GET",status="200"}} 5'
+            in text
+        ), 'Проверьте, что /metrics суммирует метрики всех воркеров'
+        assert f'yamdb_http_request_duration_seconds_count{{{labels}}} 5' in text
+        registry.flush(force=True)
+        assert len(list(tmp_path.glob('*.json'))) == 2
+
+    def test_token(self, client, settings):
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == 403
+        scrape(client, HTTP_AUTHORIZATION='Bearer secret')
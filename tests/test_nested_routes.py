@@ -0,0 +1,54 @@
+import pytest
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_comments_of_review_from_other_title(self, catalog, client,
+                                                 user_client):
+        titles, reviews = catalog
+        url = f'/api/v1/titles/{titles[1].pk}/reviews/{reviews[0].pk}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что комментарии отзыва другого произведения '
+            'возвращают 404'
+        )
+        response = user_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя комментировать отзыв через чужое '
+            'произведение'
+        )
+
+    def test_reviews_of_missing_title(self, client):
+        response = client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == 404
+
+    def test_author_permission(self, title, user, admin, user_client,
+                               moderator):
+        own = Review.objects.create(
+            title=title, author=user, text='Мой', score=5
+        )
+        other = Review.objects.create(
+            title=title, author=moderator, text='Чужой', score=5
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.patch(f'{url}{own.pk}/', {'text': 'Правка'})
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить свой отзыв'
+        )
+        response = user_client.patch(f'{url}{other.pk}/', {'text': 'Правка'})
+        assert response.status_code == 403, (
+            'Проверьте, что пользователь не может изменить чужой отзыв'
+        )
+
+    def test_review_page_query_count(self, catalog, client,
+                                     django_assert_num_queries):
+        titles, _ = catalog
+        title = Title.objects.create(name='Новое', year=2020)
+        for review in Review.objects.all()[:3]:
+            Review.objects.create(
+                title=title, author=review.author, text='a', score=1
+            )
+        for title in (titles[0], title):
+            with django_assert_num_queries(3):
+                client.get(f'/api/v1/titles/{title.pk}/reviews/')
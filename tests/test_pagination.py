@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def walk(self, client, url):
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает COUNT(*)'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            pages.append(data)
+            url = data['next']
+        return ids, pages
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/{title_id}/reviews/?cursor=',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?cursor=',
+    ))
+    def test_cursor_walks_all_items(self, catalog, client, url):
+        titles, reviews = catalog
+        url = url.format(title_id=titles[0].pk, review_id=reviews[0].pk)
+        ids, pages = self.walk(client, url)
+        assert len(ids) == 10 and ids == sorted(ids, reverse=True), (
+            'Проверьте, что курсор проходит все объекты по убыванию id '
+            'без повторов'
+        )
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка previous возвращает предыдущую страницу'
+        )
+
+    def test_page_number_pagination_is_default(self, catalog, client):
+        titles, _ = catalog
+        data = client.get(f'/api/v1/titles/{titles[0].pk}/reviews/').json()
+        assert data['count'] == 10, (
+            'Проверьте, что без ?cursor используется постраничная пагинация'
+        )
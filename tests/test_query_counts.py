@@ -0,0 +1,73 @@
+import pytest
+from users.models import User
+
+# Upper bounds of SQL queries for one page of every read endpoint.
+QUERY_CEILINGS = (
+    ('/api/v1/titles/', 3),
+    ('/api/v1/titles/?genre=drama', 3),
+    ('/api/v1/titles/?category=movie', 3),
+    ('/api/v1/titles/?ordering=-rating&rating__gte=5', 3),
+    ('/api/v1/titles/{title_id}/', 3),
+    ('/api/v1/categories/', 2),
+    ('/api/v1/genres/', 2),
+    ('/api/v1/titles/{title_id}/reviews/', 3),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/', 2),
+    ('/api/v1/titles/{title_id}/reviews/?cursor=', 2),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 3),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/?cursor=', 2),
+    ('/api/v1/users/', 2),
+    ('/api/v1/users/TestAdmin/', 1),
+)
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    @pytest.mark.parametrize('url, ceiling', QUERY_CEILINGS)
+    def test_endpoint_query_ceiling(
+        self, url, ceiling, catalog, admin_client,
+        django_assert_max_num_queries
+    ):
+        titles, reviews = catalog
+        url = url.format(title_id=titles[0].pk, review_id=reviews[0].pk)
+        with django_assert_max_num_queries(ceiling):
+            response = admin_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что запрос к {url} возвращает код 200'
+        )
+
+    def test_titles_query_count_does_not_depend_on_page(
+        self, catalog, client, django_assert_num_queries
+    ):
+        with django_assert_num_queries(3):
+            first = client.get('/api/v1/titles/')
+        with django_assert_num_queries(3):
+            last = client.get('/api/v1/titles/?page=2')
+        assert len(first.json()['results']) == len(last.json()['results']), (
+            'Проверьте, что обе страницы произведений заполнены'
+        )
+
+    def test_signup_and_token_query_counts(
+        self, client, django_assert_num_queries
+    ):
+        data = {'username': 'newuser', 'email': 'newuser@example.com'}
+        # SELECT and INSERT, wrapped in a savepoint by the test transaction.
+        with django_assert_num_queries(4):
+            assert client.post('/api/v1/auth/signup/', data).status_code == 200
+        with django_assert_num_queries(2):
+            assert client.post('/api/v1/auth/signup/', data).status_code == 200
+        user = User.objects.get(username='newuser')
+        with django_assert_num_queries(1):
+            response = client.post('/api/v1/auth/token/', {
+                'username': 'newuser',
+                'confirmation_code': user.confirmation_code,
+            })
+        assert 'access' in response.json(), (
+            'Проверьте, что токен выдаётся по последнему коду подтверждения'
+        )
+
+    def test_signup_rejects_taken_email(self, user, client):
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newuser', 'email': user.email,
+        })
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+from io import StringIO
+
+import pytest
+from api.serializers import TitleSerializer
+from django.core.management import call_command
+from django.db.models import Avg
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_writes(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10
+        )
+        Review.objects.create(
+            title=title, author=admin, text='Неплохо', score=5
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            15, 2, 7
+        ), 'Проверьте, что счётчики оценок обновляются при создании отзыва'
+
+        review.score = 1
+        review.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            6, 2, 3
+        ), 'Проверьте, что счётчики оценок обновляются при изменении оценки'
+        assert title.mean_rating == 3.0
+
+        Review.objects.all().delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            0, 0, None
+        ), 'Проверьте, что счётчики оценок обновляются при удалении отзыва'
+
+    def test_title_edit_keeps_counters(self, title, user):
+        loaded = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=user, text='a', score=9)
+        serializer = TitleSerializer(
+            loaded, data={'description': 'Новое описание'}, partial=True
+        )
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            9, 1, 9
+        ), 'Проверьте, что правка произведения не затирает счётчики оценок'
+        assert title.description == 'Новое описание'
+
+    def test_user_delete_recounts_titles(self, catalog, admin):
+        titles, reviews = catalog
+        for title in titles[:3]:
+            Review.objects.create(title=title, author=admin, text='a', score=3)
+        reviews[0].author.delete()
+        admin.delete()
+        counters = list(Title.objects.order_by('pk').values_list(
+            'score_sum', 'score_count', 'rating', 'mean_rating', 'score_3'
+        ))
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert counters == list(Title.objects.order_by('pk').values_list(
+            'score_sum', 'score_count', 'rating', 'mean_rating', 'score_3'
+        )), 'Проверьте, что удаление пользователя пересчитывает счётчики'
+
+    def test_rating_matches_average(self, title, user, admin, client):
+        Review.objects.create(title=title, author=user, text='a', score=9)
+        Review.objects.create(title=title, author=admin, text='b', score=6)
+        average = Title.objects.annotate(
+            average=Avg('reviews__score')
+        ).get(pk=title.pk).average
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['rating'] == int(average), (
+            'Проверьте, что рейтинг совпадает с целой частью средней оценки'
+        )
+
+    def test_rebuild_ratings(self, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=8)
+        Title.objects.update(score_sum=0, score_count=0, rating=None)
+        call_command('rebuild_ratings', chunk_size=1, stdout=StringIO())
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            8, 1, 8
+        ), 'Проверьте, что rebuild_ratings пересчитывает счётчики оценок'
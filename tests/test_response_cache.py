@@ -0,0 +1,59 @@
+import pytest
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/', '/api/v1/categories/', '/api/v1/genres/',
+    ))
+    def test_second_read_is_served_from_cache(
+        self, catalog, client, url, django_assert_num_queries
+    ):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert first.json() == second.json(), (
+            'Проверьте, что из кэша отдаётся тот же ответ'
+        )
+
+    def test_review_write_invalidates_title(self, title, user, client):
+        url = f'/api/v1/titles/{title.pk}/'
+        assert client.get(url).json()['rating'] is None
+        Review.objects.create(title=title, author=user, text='a', score=7)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что запись отзыва сбрасывает кэш произведения'
+        )
+
+    def test_category_write_invalidates_titles(self, title, client):
+        client.get('/api/v1/titles/')
+        title.category.delete()
+        data = client.get('/api/v1/titles/').json()
+        assert data['results'][0]['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведений'
+        )
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/categories/movie/', '/api/v1/genres/drama/',
+    ))
+    def test_no_detail_read_of_slug_resources(self, catalog, client, url):
+        assert client.get(url).status_code == 405, (
+            'Проверьте, что у категорий и жанров нет чтения по слагу'
+        )
+
+    def test_role_is_part_of_key(self, catalog, client, admin_client):
+        client.get('/api/v1/genres/')
+        assert admin_client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+
+    def test_stats(self, catalog, client, admin_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        stats = admin_client.get('/api/v1/cache/stats/').json()
+        assert stats['genres'] == {'hit': 1, 'miss': 1}, (
+            'Проверьте счётчики попаданий и промахов кэша'
+        )
+        assert client.get('/api/v1/cache/stats/').status_code == 401
@@ -0,0 +1,105 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import HISTOGRAM_FIELDS, Review, ScoreStats, Title
+
+
+def get_histogram(*scores):
+    return [scores.count(score) for score in range(1, 11)]
+
+
+@pytest.mark.django_db
+class TestScoreStats:
+
+    def test_histogram_follows_review_writes(self, catalog, user, admin):
+        titles, _ = catalog
+        title, other = titles[1], titles[2]
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10
+        )
+        Review.objects.create(
+            title=title, author=admin, text='Неплохо', score=5
+        )
+        title.refresh_from_db()
+        assert title.histogram == get_histogram(10, 5), (
+            'Проверьте, что гистограмма оценок обновляется при создании '
+            'отзыва'
+        )
+        assert title.bayesian_rating == pytest.approx(
+            (10 * 5.5 + 15) / 12
+        ), 'Проверьте расчёт байесовского рейтинга'
+
+        review.score = 1
+        review.save()
+        title.refresh_from_db()
+        assert title.histogram == get_histogram(1, 5), (
+            'Проверьте, что гистограмма обновляется при изменении оценки'
+        )
+
+        review.title = other
+        review.save()
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert (title.histogram, other.histogram) == (
+            get_histogram(5), get_histogram(1)
+        ), 'Проверьте, что отзыв переносится в гистограмму произведения'
+
+        Review.objects.filter(title__in=(title, other)).delete()
+        title.refresh_from_db()
+        assert (title.histogram, title.bayesian_rating) == (
+            get_histogram(), None
+        ), 'Проверьте, что гистограмма обновляется при удалении отзыва'
+
+    def test_rebuild_ratings(self, catalog):
+        titles, reviews = catalog
+        Title.objects.update(
+            bayesian_rating=None, **dict.fromkeys(HISTOGRAM_FIELDS, 0)
+        )
+        call_command('rebuild_ratings', chunk_size=3, stdout=StringIO())
+        mean = sum(review.score for review in reviews) / len(reviews)
+        title = Title.objects.get(pk=titles[0].pk)
+        assert title.histogram == [1] * 10, (
+            'Проверьте, что rebuild_ratings пересчитывает гистограмму оценок'
+        )
+        assert title.bayesian_rating == pytest.approx(mean), (
+            'Проверьте, что априорная оценка - средняя оценка каталога'
+        )
+        stats = ScoreStats.objects.get(scope=ScoreStats.ALL)
+        assert (stats.titles_count, stats.reviews_count, stats.mean) == (
+            10, 10, mean
+        )
+        assert ScoreStats.objects.filter(
+            scope=ScoreStats.category_scope(title.category_id)
+        ).exists(), 'Проверьте, что статистика строится по категориям'
+
+    def test_stats_endpoints(self, catalog, client, genres):
+        titles, _ = catalog
+        assert client.get(
+            '/api/v1/categories/movie/stats/'
+        ).status_code == 404, (
+            'Проверьте, что статистика до пересчёта не найдена'
+        )
+        call_command('rebuild_ratings', stdout=StringIO())
+        response = client.get(f'/api/v1/titles/{titles[0].pk}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['reviews_count'] == 10
+        assert data['histogram'] == {str(score): 1 for score in range(1, 11)}
+        assert data['bayesian_rating'] == pytest.approx(5.5)
+        for url in (
+            '/api/v1/titles/stats/',
+            '/api/v1/categories/movie/stats/',
+            f'/api/v1/genres/{genres[0].slug}/stats/',
+        ):
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что {url} доступен без авторизации'
+            )
+            data = response.json()
+            assert (data['titles_count'], data['reviews_count']) == (10, 10)
+            assert data['mean'] == 5.5
+            assert data['histogram']['10'] == 1
+        assert client.get(
+            '/api/v1/genres/missing/stats/'
+        ).status_code == 404
@@ -0,0 +1,165 @@
+import json
+import socketserver
+import threading
+
+import pytest
+from api import mail
+from api.mail import MailQueue
+from django.core.mail import EmailMessage
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from smtplib."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        data = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if data is not None:
+                if line.rstrip(b'\r\n') == b'.':
+                    self.server.messages.append(b''.join(data).decode())
+                    data = None
+                    self.reply('250 OK')
+                else:
+                    data.append(line)
+                continue
+            command = line[:4].upper()
+            if command == b'MAIL' and self.server.failures:
+                self.server.failures -= 1
+                self.reply('451 Try again later')
+            elif command == b'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.messages, server.failures = 0, [], 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_queue(tmp_path, **kwargs):
+    options = {
+        'workers': 1, 'batch_size': 10, 'batch_wait': 0.2, 'retries': 2,
+        'retry_delay': 0, 'backend': SMTP_BACKEND,
+        'dead_letter_file': str(tmp_path / 'dead_letters.ndjson'),
+    }
+    options.update(kwargs)
+    return MailQueue(**options)
+
+
+def get_message(number=0):
+    return EmailMessage('Код', f'код {number}', 'a@example.com',
+                        [f'user{number}@example.com'])
+
+
+class TestMailQueue:
+
+    def test_batch_uses_one_connection(self, smtp_server, tmp_path):
+        queue = get_queue(tmp_path)
+        for number in range(5):
+            queue.put(get_message(number))
+        assert queue.flush(timeout=5)
+        assert len(smtp_server.messages) == 5
+        assert smtp_server.connections == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        stats = queue.get_stats()
+        assert (stats['sent'], stats['queue_depth']) == (5, 0)
+        assert stats['latency']['count'] == 5
+
+    def test_refused_message_is_retried(self, smtp_server, tmp_path):
+        smtp_server.failures = 1
+        queue = get_queue(tmp_path)
+        queue.put(get_message())
+        assert queue.flush(timeout=5)
+        assert len(smtp_server.messages) == 1, (
+            'Проверьте, что отклонённое письмо отправляется повторно'
+        )
+        assert queue.get_stats()['retried'] == 1
+
+    def test_undelivered_message_goes_to_dead_letters(
+        self, smtp_server, tmp_path
+    ):
+        smtp_server.failures = 10
+        queue = get_queue(tmp_path)
+        queue.put(get_message())
+        assert queue.flush(timeout=5)
+        lines = (tmp_path / 'dead_letters.ndjson').read_text().splitlines()
+        assert [json.loads(line)['to'] for line in lines] == [
+            ['user0@example.com']
+        ], 'Проверьте, что недоставленное письмо пишется в dead letter файл'
+        assert queue.get_stats()['dead'] == 1
+
+    def test_queue_is_flushed_at_exit(self, smtp_server, tmp_path,
+                                      monkeypatch):
+        registered = []
+        monkeypatch.setattr(mail.atexit, 'register', registered.append)
+        queue = get_queue(tmp_path)
+        for number in range(3):
+            queue.put(get_message(number))
+        assert registered == [queue.shutdown], (
+            'Проверьте, что очередь писем дописывается при выходе'
+        )
+        assert queue.shutdown(timeout=5)
+        assert len(smtp_server.messages) == 3
+
+    def test_messages_left_at_exit_go_to_dead_letters(
+        self, smtp_server, tmp_path
+    ):
+        smtp_server.failures = 10
+        queue = get_queue(tmp_path, batch_size=1, retry_delay=60)
+        for number in range(3):
+            queue.put(get_message(number))
+        assert not queue.shutdown(timeout=0.5)
+        lines = (tmp_path / 'dead_letters.ndjson').read_text().splitlines()
+        assert [json.loads(line)['to'] for line in lines] == [
+            ['user1@example.com'], ['user2@example.com']
+        ], 'Проверьте, что оставшиеся при выходе письма пишутся в dead letters'
+
+
+@pytest.mark.django_db
+class TestSignupMail:
+
+    def test_signup_enqueues_mail(
+        self, client, smtp_server, tmp_path, monkeypatch
+    ):
+        queue = get_queue(tmp_path)
+        monkeypatch.setattr(mail, 'mail_queue', queue)
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'newuser', 'email': 'newuser@example.com',
+        })
+        assert response.status_code == 200
+        assert queue.flush(timeout=5)
+        assert len(smtp_server.messages) == 1
+        assert 'newuser@example.com' in smtp_server.messages[0], (
+            'Проверьте, что код подтверждения уходит на почту пользователя'
+        )
+
+    def test_stats_are_for_admins(
+        self, client, admin_client, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(mail, 'mail_queue', get_queue(tmp_path))
+        assert client.get('/api/v1/mail/stats/').status_code == 401
+        stats = admin_client.get('/api/v1/mail/stats/').json()
+        assert stats['queue_depth'] == 0
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_title_fields(self, catalog, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                '/api/v1/titles/', {'fields': 'id,name,rating'}
+            )
+        assert set(response.json()['results'][0]) == {'id', 'name', 'rating'}
+        assert len(queries) == 2, (
+            'Проверьте, что без жанров не выполняется prefetch'
+        )
+        sql = queries[-1]['sql']
+        assert 'JOIN' not in sql and 'description' not in sql, (
+            'Проверьте, что не запрошенные поля и связи не загружаются'
+        )
+
+    def test_title_expand(self, title, client):
+        data = client.get(
+            f'/api/v1/titles/{title.pk}/', {'expand': 'genre'}
+        ).json()
+        assert data['category'] == 'movie'
+        assert {'name': 'Драма', 'slug': 'drama'} in data['genre']
+        data = client.get(
+            f'/api/v1/titles/{title.pk}/', {'fields': 'id,genre', 'expand': ''}
+        ).json()
+        data['genre'].sort()
+        assert data == {'id': title.pk, 'genre': ['comedy', 'drama']}, (
+            'Проверьте, что без expand жанры отдаются слагами'
+        )
+
+    def test_title_default_is_unchanged(self, title, client):
+        data = client.get(f'/api/v1/titles/{title.pk}/').json()
+        assert data['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(data['genre']) == 2
+
+    def test_review_fields_skip_author_join(self, catalog, client):
+        titles, _ = catalog
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                f'/api/v1/titles/{titles[0].pk}/reviews/',
+                {'fields': 'id,score'},
+            )
+        assert set(response.json()['results'][0]) == {'id', 'score'}
+        assert 'users_user' not in queries[-1]['sql']
+
+    def test_review_expand(self, catalog, client):
+        titles, reviews = catalog
+        data = client.get(
+            f'/api/v1/titles/{titles[0].pk}/reviews/{reviews[0].pk}/',
+            {'expand': 'author,title'},
+        ).json()
+        assert data['author'] == {
+            'username': reviews[0].author.username,
+        }, 'Проверьте, что раскрытый автор не содержит данных профиля'
+        assert data['title']['name'] == titles[0].name
+
+    def test_comment_fields(self, catalog, client):
+        titles, reviews = catalog
+        response = client.get(
+            f'/api/v1/titles/{titles[0].pk}/reviews/{reviews[0].pk}'
+            '/comments/', {'fields': 'text', 'expand': 'author'},
+        )
+        assert set(response.json()['results'][0]) == {'text'}
+
+    def test_writes_ignore_fields(self, title, user_client):
+        response = user_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/?fields=id',
+            {'text': 'Отлично', 'score': 9},
+        )
+        assert response.status_code == 201
+        assert response.json()['score'] == 9
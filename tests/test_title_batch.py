@@ -0,0 +1,76 @@
+import pytest
+from reviews.models import Title
+
+URL = '/api/v1/titles/batch/'
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+
+    def test_creates_and_updates_in_few_queries(
+        self, title, admin_client, django_assert_max_num_queries
+    ):
+        batch = [
+            {'name': f'Новинка {number}', 'year': 2000 + number,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for number in range(20)
+        ]
+        batch.append({'id': title.pk, 'year': 1995, 'genre': ['comedy']})
+        with django_assert_max_num_queries(12):
+            response = admin_client.post(URL, batch, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results] == (
+            ['created'] * 20 + ['updated']
+        )
+        created = Title.objects.get(pk=results[0]['id'])
+        assert created.name == 'Новинка 0'
+        assert sorted(created.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ], 'Проверьте, что жанры новых произведений связаны'
+        title.refresh_from_db()
+        assert title.year == 1995
+        assert list(title.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ], 'Проверьте, что жанры обновлённого произведения заменены'
+
+    def test_reports_errors_per_item(self, title, admin_client):
+        response = admin_client.post(URL, [
+            {'name': 'Новое', 'year': 2001, 'category': 'movie',
+             'genre': ['drama']},
+            {'name': 'Без жанра', 'year': 2001, 'category': 'movie',
+             'genre': ['unknown']},
+            {'name': title.name, 'year': 2001, 'category': 'movie',
+             'genre': []},
+            {'name': 'Будущее', 'year': 3000, 'category': 'movie',
+             'genre': []},
+            {'name': 'Без категории', 'year': 2001, 'category': 'nope',
+             'genre': []},
+            {'id': 100500, 'year': 2001},
+        ], format='json')
+        results = response.json()
+        assert results[0]['status'] == 'created'
+        assert [result['status'] for result in results[1:]] == ['error'] * 5
+        assert [list(result['errors']) for result in results[1:]] == [
+            ['genre'], ['name'], ['year'], ['category'], ['id']
+        ], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert Title.objects.count() == 2
+
+    def test_bumps_version_and_drops_cache(self, title, admin_client, client):
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        admin_client.post(
+            URL, [{'id': title.pk, 'name': 'Зелёная миля'}], format='json'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Зелёная миля', (
+            'Проверьте, что пакетная запись сбрасывает кэш и ETag'
+        )
+
+    def test_admin_only_and_list_only(self, user_client, admin_client):
+        assert user_client.post(URL, [], format='json').status_code == 403
+        response = admin_client.post(URL, {'name': 'a'}, format='json')
+        assert response.status_code == 400
@@ -0,0 +1,74 @@
+import pytest
+from reviews.models import Review
+
+
+def get_names(response):
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    def test_ordering_by_rating(self, rated_catalog, client):
+        names = get_names(client.get(
+            '/api/v1/titles/?ordering=-rating&expand='
+        ))
+        assert names == [
+            'Произведение 1', 'Произведение 3', 'Произведение 2',
+            'Произведение 0', 'Произведение 4',
+        ], (
+            'Проверьте, что ordering=-rating упорядочивает по рейтингу и '
+            'числу отзывов, произведения без оценок идут последними'
+        )
+        names = get_names(client.get('/api/v1/titles/?ordering=rating'))
+        assert names[:2] == ['Произведение 4', 'Произведение 0'], (
+            'Проверьте сортировку по возрастанию рейтинга'
+        )
+
+    def test_ordering_by_exact_mean(self, rated_catalog, client, admin, user):
+        titles = rated_catalog
+        for title, score in ((titles[1], 10), (titles[2], 7)):
+            Review.objects.create(
+                title=title, author=admin, text='Отзыв', score=score
+            )
+        for author in (admin, user, titles[0].reviews.first().author):
+            Review.objects.create(
+                title=titles[5], author=author, text='Отзыв', score=9
+            )
+        names = get_names(client.get('/api/v1/titles/?ordering=-rating'))
+        assert names[:2] == ['Произведение 1', 'Произведение 5'], (
+            'Проверьте, что произведения с одним целым рейтингом '
+            'упорядочены по точной средней оценке'
+        )
+        names = get_names(client.get('/api/v1/titles/?ordering=rating'))
+        assert names[2:4] == ['Произведение 2', 'Произведение 3'], (
+            'Проверьте, что равные оценки по возрастанию идут по id'
+        )
+
+    def test_range_filters(self, rated_catalog, client):
+        assert sorted(get_names(client.get(
+            '/api/v1/titles/?rating__gte=7'
+        ))) == ['Произведение 1', 'Произведение 2', 'Произведение 3'], (
+            'Проверьте фильтр rating__gte'
+        )
+        assert get_names(client.get(
+            '/api/v1/titles/?reviews_count__gte=2&ordering=-reviews_count'
+        )) == ['Произведение 0', 'Произведение 3'], (
+            'Проверьте фильтр reviews_count__gte и сортировку по числу '
+            'отзывов'
+        )
+        assert get_names(client.get(
+            '/api/v1/titles/?year__gte=2008&ordering=-year'
+        )) == ['Произведение 9', 'Произведение 8'], (
+            'Проверьте фильтр year__gte и сортировку по году'
+        )
+        assert get_names(client.get(
+            '/api/v1/titles/?year__lte=2001&category=movie&genre=drama'
+        )) == ['Произведение 0', 'Произведение 1']
+
+    def test_unknown_ordering(self, catalog, client):
+        response = client.get('/api/v1/titles/?ordering=password')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле сортировки возвращает код 400'
+        )
@@ -0,0 +1,84 @@
+import pytest
+from django.core.management.base import CommandError
+from django.db import connection
+from reviews import search
+from reviews.models import Title
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def library(category):
+    return [
+        Title.objects.create(
+            name='Мастер и Маргарита', year=1967, category=category,
+            description='Роман о дьяволе, любви и сердце писателя',
+        ),
+        Title.objects.create(
+            name='Собачье сердце', year=1925, category=category,
+            description='Повесть о профессоре',
+        ),
+        Title.objects.create(
+            name='Москва-Петушки', year=1970, category=category,
+            description='Поэма о сердце и дороге',
+        ),
+    ]
+
+
+def get_names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_name_match_ranks_first(self, library, client):
+        response = client.get(URL, {'search': 'сердце'})
+        assert response.status_code == 200
+        assert get_names(response)[0] == 'Собачье сердце', (
+            'Проверьте, что совпадение в названии выше совпадения в описании'
+        )
+        assert response.json()['count'] == 3
+
+    def test_words_must_all_match(self, library, client):
+        response = client.get(URL, {'search': 'повесть профессор'})
+        assert get_names(response) == ['Собачье сердце']
+
+    def test_index_follows_writes(self, library, client):
+        library[0].name = 'Белая гвардия'
+        library[0].save()
+        Title.objects.filter(pk=library[2].pk).delete()
+        assert get_names(client.get(URL, {'search': 'гвардия'})) == [
+            'Белая гвардия'
+        ], 'Проверьте, что индекс поиска обновляется при записи'
+        assert get_names(client.get(URL, {'search': 'Петушки'})) == []
+
+    def test_search_syntax_is_not_passed_through(self, library, client):
+        for query in ('"', 'NEAR(', 'name:*', 'AND OR', '   '):
+            response = client.get(URL, {'search': query})
+            assert response.status_code == 200, (
+                f'Проверьте, что запрос {query!r} не ломает поиск'
+            )
+
+    def test_paginated(self, catalog, client):
+        response = client.get(URL, {'search': 'Произведение'})
+        data = response.json()
+        assert data['count'] == 10 and len(data['results']) == 5
+
+
+@pytest.mark.django_db
+class TestSearchIndexCheck:
+
+    def test_index_exists_after_migrations(self):
+        assert search.get_missing_index(connection) == [], (
+            'Проверьте, что после всех миграций индекс поиска на месте'
+        )
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='SQLite triggers'
+    )
+    def test_dropped_trigger_fails_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_fts_update')
+        with pytest.raises(CommandError, match='reviews_title_fts_update'):
+            search.check_index(using='default')
@@ -0,0 +1,71 @@
+import pytest
+from api.authentication import CACHED_FIELDS, get_cache, get_user_key
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def get_token_client(user):
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestUserCache:
+
+    def test_second_request_skips_user_lookup(
+        self, user, django_assert_num_queries
+    ):
+        client = get_token_client(user)
+        client.get('/api/v1/users/me/')
+        # Only the profile read of /me/, no token user lookup.
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == user.username, (
+            'Проверьте, что пользователь из кэша совпадает с токеном'
+        )
+
+    def test_cache_holds_no_secrets(self, user, settings):
+        get_token_client(user).get('/api/v1/users/me/')
+        cached = get_cache().get(get_user_key(user.pk))
+        assert set(cached) == set(CACHED_FIELDS), (
+            'Проверьте, что в кэше хранятся только поля для проверки прав'
+        )
+        assert settings.USER_CACHE_TIMEOUT <= 10, (
+            'Проверьте, что кэш пользователя в памяти процесса живёт недолго'
+        )
+
+    def test_role_change_applies_at_once(self, user, admin):
+        client = get_token_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        response = get_token_client(admin).patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает пользователя в кэше'
+        )
+
+    def test_deleted_user_is_rejected(self, user, admin):
+        client = get_token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        response = get_token_client(admin).delete(
+            f'/api/v1/users/{user.username}/'
+        )
+        assert response.status_code == 204
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь не проходит проверку токена'
+        )
+
+    def test_cached_user_writes_review(self, user, title):
+        client = get_token_client(user)
+        client.get('/api/v1/users/me/')
+        response = client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            {'text': 'Отзыв', 'score': 5},
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username, (
+            'Проверьте, что автор из кэша подгружает остальные поля из базы'
+        )